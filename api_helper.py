@@ -1,10 +1,63 @@
 from NorenRestApiPy.NorenApi import  NorenApi
+import NorenRestApiPy.NorenApi as noren_module
 from threading import Timer
+import threading
 import pandas as pd
 import time
 import concurrent.futures
+import requests
+from requests.adapters import HTTPAdapter
 
 api = None
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+# Keep-alive connections per host. Covers the widest concurrent fan-out (the 10-worker
+# service pool plus a 5-exchange search) so threads never queue for a socket.
+HTTP_POOL_MAXSIZE = 20
+
+
+def get_http_session():
+    """
+    Get the process-wide pooled HTTP session used for all Noren REST calls.
+
+    NorenApi posts through the module-level ``requests`` functions, which open
+    a fresh TCP+TLS connection per call. Routing them through one Session keeps
+    connections alive across calls.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=10,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    # No transport-level retries: FlattradeService._call_with_retry is the single
+                    # retry layer, so attempts and backoff don't multiply
+                    max_retries=0
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _http_session = session
+    return _http_session
+
+
+class PooledRequests:
+    """Stand-in for the ``requests`` module that sends through the pooled session"""
+
+    def post(self, *args, **kwargs):
+        return get_http_session().post(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        return get_http_session().get(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+noren_module.requests = PooledRequests()
 class Order:
      def __init__(self, buy_or_sell:str = None, product_type:str = None,
                  exchange: str = None, tradingsymbol:str =None, 
@@ -44,6 +97,7 @@ class NorenApiPy(NorenApi):
 
         global api
         api = self
+        self.session = get_http_session()
     def place_basket(self, orders):
 
         resp_err = 0
@@ -1,18 +1,141 @@
+import asyncio
+import copy
 import datetime
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from api_helper import NorenApiPy
 
+logger = logging.getLogger(__name__)
+
+# Exchanges queried by search_stock
+SEARCH_EXCHANGES = ('NSE', 'BSE', 'NFO', 'CDS', 'MCX')
+
+# Known index tokens probed by get_major_indices_info
+MAJOR_INDICES_TOKENS = (
+    ('26000', 'NIFTY'),           # Main Nifty 50
+    ('99926000', 'NIFTY'),        # New Nifty 50 token
+    ('26001', 'NIFTY BANK'),      # Bank Nifty
+    ('99926001', 'NIFTY BANK'),   # New Bank Nifty token
+)
+
+# Failures a retry may fix: network errors and bodies that are not JSON (e.g. rate-limit pages)
+TRANSIENT_ERRORS = (requests.RequestException, ValueError)
+
+# Lower-cased emsg fragments Noren uses for rate limiting
+RATE_LIMIT_MARKERS = ('rate limit', 'too many requests')
+
+# Successful API responses shared by all clients in the process
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+RESPONSE_CACHE_MAXSIZE = 2048
+
+# NSE opens at 09:15 IST (03:45 UTC); cache buckets are aligned to it so they
+# start on candle boundaries instead of on the UTC epoch grid
+SESSION_OPEN_UTC_SECONDS = 3 * 3600 + 45 * 60
+
+def ttl_cache(ttl_fn):
+    """
+    Cache successful responses of a client method for a time bucket
+    
+    The cache key is built from the call arguments plus the current bucket.
+    Buckets are TTL-long windows counted from the 09:15 IST session open, so
+    for candle-sized TTLs a new candle always misses. Callers get their own
+    copy of the response. Pass cache=False to the decorated method to force
+    a refresh.
+    
+    Args:
+        ttl_fn (callable): Receives the bound arguments dict, returns TTL in seconds
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        def wrapper(self, *args, cache=True, **kwargs):
+            if not cache:
+                return func(self, *args, **kwargs)
+            
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = {name: value for name, value in bound.arguments.items() if name != 'self'}
+            ttl = ttl_fn(params)
+            offset = SESSION_OPEN_UTC_SECONDS % ttl
+            bucket = int((time.time() - offset) // ttl)
+            key = hashlib.md5(
+                json.dumps([func.__name__, params, bucket], sort_keys=True, default=str).encode()
+            ).hexdigest()
+            
+            with _response_cache_lock:
+                entry = _response_cache.get(key)
+            if entry and entry[0] > time.time():
+                return copy.deepcopy(entry[1])
+            
+            result = func(self, *args, **kwargs)
+            if isinstance(result, dict) and result.get('stat') == 'Ok':
+                with _response_cache_lock:
+                    if len(_response_cache) >= RESPONSE_CACHE_MAXSIZE:
+                        now = time.time()
+                        for stale_key in [k for k, v in _response_cache.items() if v[0] <= now]:
+                            del _response_cache[stale_key]
+                        if len(_response_cache) >= RESPONSE_CACHE_MAXSIZE:
+                            del _response_cache[next(iter(_response_cache))]
+                    _response_cache[key] = ((bucket + 1) * ttl + offset, copy.deepcopy(result))
+            return result
+        
+        return wrapper
+    return decorator
+
+def _transient_error(exc):
+    """Not_Ok response for a transient failure, flagged so callers know a retry may succeed"""
+    return {'stat': 'Not_Ok', 'emsg': str(exc), 'transient': True}
+
+@functools.lru_cache(maxsize=8)
+def _midnight_ts(day):
+    """Epoch timestamp of local midnight at the start of the given date"""
+    return datetime.datetime.combine(day, datetime.time.min).timestamp()
+
 class FlattradeClient:
-    def __init__(self, userid, token):
+    # (date, indices) from the last successful get_major_indices_info()
+    _discovered_indices = None
+    _discovered_indices_lock = threading.Lock()
+    
+    def __init__(self, userid, token, local_lookup=None):
         """
         Initialize Flattrade client with user credentials
         
         Args:
             userid (str): Your Flattrade user ID
             token (str): Daily generated token
+            local_lookup (callable, optional): Takes search text and returns already
+                                               known scrips in searchscrip result shape
         """
         self.api = NorenApiPy()
+        self.session = self.api.session
         self.userid = userid
         self.token = token
+        self.local_lookup = local_lookup
+        self.is_connected = False
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def close(self):
+        """
+        Mark the client as disconnected
+        
+        The HTTP session is the process-wide pool from api_helper.get_http_session(),
+        shared with every other client, so it is left open.
+        """
         self.is_connected = False
         
     def setup_session(self):
@@ -32,68 +155,25 @@ class FlattradeClient:
             # Check if ret is a dictionary and has the expected structure
             if isinstance(ret, dict) and ret.get('stat') == 'Ok':
                 self.is_connected = True
-                print(f"✅ Connected successfully as {self.userid}")
+                logger.info("✅ Connected successfully as %s", self.userid)
                 return ret
             elif ret is True:
                 # Some versions of the API return True on successful connection
                 self.is_connected = True
-                print(f"✅ Connected successfully as {self.userid}")
+                logger.info("✅ Connected successfully as %s", self.userid)
                 return {"stat": "Ok", "userid": self.userid}
             else:
                 self.is_connected = False
                 if isinstance(ret, dict):
                     error_msg = ret.get('emsg', 'Unknown error')
-                    print(f"❌ Connection failed: {error_msg}")
+                    logger.error("❌ Connection failed: %s", error_msg)
                 else:
-                    print(f"❌ Connection failed: Invalid response - {ret}")
+                    logger.error("❌ Connection failed: Invalid response - %s", ret)
                 return ret
                 
         except Exception as e:
             self.is_connected = False
-            print(f"❌ Error connecting: {e}")
-            return None
-    
-    def get_ohlc_data(self, token, exchange='NSE', interval=5, start_time=None):
-        """
-        Fetch OHLC data for a given stock token.
-        
-        Args:
-            token (str): The scrip token.
-            exchange (str, optional): The exchange. Defaults to 'NSE'.
-            interval (int, optional): The candle interval in minutes. Defaults to 5.
-            start_time (datetime.datetime, optional): The start time for the data. 
-                                                     Defaults to the beginning of today.
-        
-        Returns:
-            dict: OHLC data response
-        """
-        if not self.is_connected:
-            print("❌ Not connected. Please run setup_session() first.")
-            return None
-
-        try:
-            if start_time is None:
-                # Set start time to beginning of today
-                start_time = datetime.datetime.today().replace(hour=0, minute=0, second=0, microsecond=0)
-
-            print(f"📊 Fetching OHLC data for token {token} from {start_time}")
-
-            ret = self.api.get_time_price_series(
-                exchange=exchange,
-                token=token,
-                starttime=start_time.timestamp(),
-                interval=interval
-            )
-
-            if ret and ret.get('stat') == 'Ok':
-                print(f"✅ Retrieved {len(ret.get('data', []))} data points")
-                return ret
-            else:
-                print(f"❌ Failed to fetch data: {ret}")
-                return ret
-
-        except Exception as e:
-            print(f"❌ Error fetching OHLC data: {e}")
+            logger.error("❌ Error connecting: %s", e)
             return None
     
     def get_live_quotes(self, symbol='RELIANCE-EQ', exchange='NSE'):
@@ -108,7 +188,7 @@ class FlattradeClient:
             dict: Live quotes data
         """
         if not self.is_connected:
-            print("❌ Not connected. Please run setup_session() first.")
+            logger.error("❌ Not connected. Please run setup_session() first.")
             return None
             
         try:
@@ -122,24 +202,26 @@ class FlattradeClient:
                 if search_result and search_result.get('values'):
                     token = search_result['values'][0]['token']
                 else:
-                    print(f"❌ Could not find token for symbol: {symbol}")
+                    logger.error("❌ Could not find token for symbol: %s", symbol)
                     return None
             
             quotes = self.api.get_quotes(exchange=exchange, token=token)
             
             if quotes and quotes.get('stat') == 'Ok':
-                print(f"✅ Live quotes for {symbol}:")
-                print(f"   LTP: ₹{quotes.get('lp', 'N/A')}")
-                print(f"   Open: ₹{quotes.get('o', 'N/A')}")
-                print(f"   High: ₹{quotes.get('h', 'N/A')}")
-                print(f"   Low: ₹{quotes.get('l', 'N/A')}")
+                logger.debug(
+                    "✅ Live quotes for %s: LTP ₹%s, Open ₹%s, High ₹%s, Low ₹%s",
+                    symbol, quotes.get('lp', 'N/A'), quotes.get('o', 'N/A'),
+                    quotes.get('h', 'N/A'), quotes.get('l', 'N/A')
+                )
                 return quotes
             else:
-                print(f"❌ Failed to fetch quotes: {quotes}")
+                logger.error("❌ Failed to fetch quotes: %s", quotes)
                 return quotes
                 
         except Exception as e:
-            print(f"❌ Error fetching quotes: {e}")
+            logger.error("❌ Error fetching quotes: %s", e)
+            if isinstance(e, TRANSIENT_ERRORS):
+                return _transient_error(e)
             return None
     
     def get_major_indices_info(self):
@@ -147,112 +229,184 @@ class FlattradeClient:
         Get information about major indices by testing known tokens
         This is discovery-based, not hardcoded user data
         
+        Index tokens do not change during the day, so a successful discovery
+        is reused until the date rolls over.
+        
         Returns:
             list: List of major indices with their details
         """
-        major_indices_tokens = [
-            ('26000', 'NIFTY'),           # Main Nifty 50 
-            ('99926000', 'NIFTY'),        # New Nifty 50 token
-            ('26001', 'NIFTY BANK'),      # Bank Nifty
-            ('99926001', 'NIFTY BANK'),   # New Bank Nifty token
-        ]
+        today = datetime.date.today()
+        with FlattradeClient._discovered_indices_lock:
+            cached = FlattradeClient._discovered_indices
+        if cached and cached[0] == today:
+            return [dict(index_info) for index_info in cached[1]]
         
         discovered_indices = []
         
-        for token, expected_symbol in major_indices_tokens:
-            try:
-                print(f"🔍 Testing token {token} for {expected_symbol}...")
-                # Try to get quotes to verify if token exists
-                quotes = self.api.get_quotes(exchange='NSE', token=token)
-                
-                if quotes and quotes.get('stat') == 'Ok':
-                    discovered_indices.append({
-                        'token': token,
-                        'tsym': expected_symbol,
-                        'exch': 'NSE',
-                        'instname': 'INDEX',
-                        'search_exchange': 'NSE',
-                        'cname': f'{expected_symbol} Index',
-                        'discovered': True
-                    })
-                    print(f"✅ Discovered: {expected_symbol} with token {token}")
-                else:
-                    print(f"❌ Token {token} not valid for {expected_symbol}")
-                    
-            except Exception as e:
-                print(f"❌ Error testing token {token}: {e}")
-                continue
+        with ThreadPoolExecutor(max_workers=len(MAJOR_INDICES_TOKENS)) as executor:
+            futures = [
+                executor.submit(self._probe_index_token, token, expected_symbol)
+                for token, expected_symbol in MAJOR_INDICES_TOKENS
+            ]
+            for future in futures:
+                index_info = future.result()
+                if index_info:
+                    discovered_indices.append(index_info)
+        
+        if discovered_indices:
+            with FlattradeClient._discovered_indices_lock:
+                FlattradeClient._discovered_indices = (today, discovered_indices)
+            return [dict(index_info) for index_info in discovered_indices]
         
         return discovered_indices
 
-    def search_stock(self, search_text):
+    def _probe_index_token(self, token, expected_symbol):
+        """
+        Check whether an index token returns quotes
+        
+        Args:
+            token (str): Index token to test
+            expected_symbol (str): Symbol the token is expected to map to
+            
+        Returns:
+            dict: Index details if the token is valid, otherwise None
+        """
+        try:
+            logger.debug("Testing token %s for %s", token, expected_symbol)
+            # Try to get quotes to verify if token exists
+            quotes = self.api.get_quotes(exchange='NSE', token=token)
+            
+            if quotes and quotes.get('stat') == 'Ok':
+                logger.info("Discovered: %s with token %s", expected_symbol, token)
+                return {
+                    'token': token,
+                    'tsym': expected_symbol,
+                    'exch': 'NSE',
+                    'instname': 'INDEX',
+                    'search_exchange': 'NSE',
+                    'cname': f'{expected_symbol} Index',
+                    'discovered': True
+                }
+            else:
+                logger.warning("Token %s not valid for %s", token, expected_symbol)
+                
+        except Exception as e:
+            logger.error("❌ Error testing token %s: %s", token, e)
+        
+        return None
+
+    def _search_one(self, exchange, search_text):
+        """
+        Search a single exchange for a scrip
+        
+        Args:
+            exchange (str): Exchange to search
+            search_text (str): Text to search for
+            
+        Returns:
+            tuple: (exchange, list of results found in that exchange,
+                    transient Not_Ok response if a retry may succeed, else None)
+        """
+        try:
+            logger.debug("Searching in %s for '%s'", exchange, search_text)
+            ret = self.api.searchscrip(exchange=exchange, searchtext=search_text)
+            
+            logger.debug("Raw response from %s: %s", exchange, ret)
+            
+            if ret and ret.get('stat') == 'Ok' and ret.get('values'):
+                results = ret.get('values', [])
+                # Add exchange info to each result for identification
+                debug_enabled = logger.isEnabledFor(logging.DEBUG)
+                for result in results:
+                    result['search_exchange'] = exchange
+                    if debug_enabled:
+                        logger.debug("   Found: %s | Token: %s | Type: %s",
+                                     result.get('tsym', 'N/A'), result.get('token', 'N/A'), result.get('instname', 'N/A'))
+                logger.debug("Found %d results in %s", len(results), exchange)
+                return exchange, results, None
+            elif ret and ret.get('stat') == 'Ok':
+                logger.debug("%s returned OK but no values", exchange)
+            else:
+                logger.debug("No results in %s: %s", exchange, ret)
+                emsg = str((ret or {}).get('emsg', '')).lower()
+                if any(marker in emsg for marker in RATE_LIMIT_MARKERS):
+                    return exchange, [], dict(ret, transient=True)
+                
+        except Exception as e:
+            logger.error("❌ Error searching %s: %s", exchange, e)
+            if isinstance(e, TRANSIENT_ERRORS):
+                return exchange, [], _transient_error(e)
+        
+        return exchange, [], None
+
+    def search_stock(self, search_text, use_local=True):
         """
         Search for stocks and indices by name across multiple exchanges
         Also includes discovery of major indices if searching for 'nifty'
         
         Args:
             search_text (str): Text to search for
+            use_local (bool): Answer from local_lookup when it has matches (default: True)
             
         Returns:
             dict: Combined search results from multiple exchanges
         """
         if not self.is_connected:
-            print("❌ Not connected. Please run setup_session() first.")
+            logger.error("❌ Not connected. Please run setup_session() first.")
             return None
+        
+        if use_local and self.local_lookup:
+            local_results = self.local_lookup(search_text)
+            if local_results:
+                logger.info("✅ Found %d local results for '%s'", len(local_results), search_text)
+                return {
+                    'stat': 'Ok',
+                    'values': local_results
+                }
             
         all_results = []
-        exchanges_to_search = ['NSE', 'BSE', 'NFO', 'CDS', 'MCX']
+        # Exchanges are searched in parallel; results keep the exchange order
+        results_by_exchange = {}
+        failures = []
+        with ThreadPoolExecutor(max_workers=len(SEARCH_EXCHANGES)) as executor:
+            futures = [
+                executor.submit(self._search_one, exchange, search_text)
+                for exchange in SEARCH_EXCHANGES
+            ]
+            for future in as_completed(futures):
+                exchange, results, failure = future.result()
+                results_by_exchange[exchange] = results
+                if failure:
+                    failures.append(failure)
         
-        for exchange in exchanges_to_search:
-            try:
-                print(f"🔍 Searching in {exchange} for '{search_text}'...")
-                ret = self.api.searchscrip(exchange=exchange, searchtext=search_text)
-                
-                print(f"📋 Raw response from {exchange}: {ret}")
-                
-                if ret and ret.get('stat') == 'Ok' and ret.get('values'):
-                    results = ret.get('values', [])
-                    # Add exchange info to each result for identification
-                    for result in results:
-                        result['search_exchange'] = exchange
-                        # Debug: Print each result to see what we're getting
-                        print(f"   📊 Found: {result.get('tsym', 'N/A')} | Token: {result.get('token', 'N/A')} | Type: {result.get('instname', 'N/A')}")
-                    all_results.extend(results)
-                    print(f"✅ Found {len(results)} results in {exchange}")
-                elif ret and ret.get('stat') == 'Ok':
-                    print(f"⚠️ {exchange} returned OK but no values")
-                else:
-                    print(f"⚠️ No results in {exchange}: {ret}")
-                    
-            except Exception as e:
-                print(f"❌ Error searching {exchange}: {e}")
-                continue
+        for exchange in SEARCH_EXCHANGES:
+            all_results.extend(results_by_exchange.get(exchange, []))
         
         # If searching for 'nifty', also try to discover major indices
-        print(f"DEBUG: Checking if '{search_text}' contains 'nifty': {'nifty' in search_text.lower()}")
         if 'nifty' in search_text.lower():
-            print(f"🔍 DISCOVERY STARTING: Also discovering major indices for search: '{search_text}'...")
+            logger.debug("🔍 Also discovering major indices for search: '%s'...", search_text)
             try:
                 discovered_indices = self.get_major_indices_info()
-                print(f"DEBUG: Discovery returned {len(discovered_indices) if discovered_indices else 0} indices")
                 if discovered_indices:
                     all_results.extend(discovered_indices)
-                    print(f"✅ Added {len(discovered_indices)} discovered indices")
+                    logger.debug("✅ Added %d discovered indices", len(discovered_indices))
                 else:
-                    print(f"⚠️ No indices discovered through token testing")
+                    logger.warning("⚠️ No indices discovered through token testing")
             except Exception as e:
-                print(f"❌ Error during index discovery: {e}")
-                import traceback
-                print(traceback.format_exc())
+                logger.exception("❌ Error during index discovery: %s", e)
 
         if all_results:
-            print(f"✅ Total found: {len(all_results)} results across all exchanges")
+            logger.info("✅ Total found: %d results across all exchanges", len(all_results))
             return {
                 'stat': 'Ok',
                 'values': all_results
             }
+        elif failures:
+            # Nothing found because a search failed, not because nothing matched; callers may retry
+            logger.warning("⚠️ Search for '%s' failed: %s", search_text, failures[0].get('emsg'))
+            return failures[0]
         else:
-            print(f"❌ No results found for '{search_text}' in any exchange")
+            logger.info("❌ No results found for '%s' in any exchange", search_text)
             return {
                 'stat': 'Not_Ok',
                 'emsg': f'No results found for {search_text}'
@@ -266,37 +420,37 @@ class FlattradeClient:
             dict: OHLC data response
         """
         if not self.is_connected:
-            print("❌ Not connected. Please run setup_session() first.")
+            logger.error("❌ Not connected. Please run setup_session() first.")
             return None
             
         try:
             # Set start time to beginning of today
-            lastBusDay = datetime.datetime.today()
-            lastBusDay = lastBusDay.replace(hour=0, minute=0, second=0, microsecond=0)
+            lastBusDay = datetime.date.today()
             
-            print(f"📊 Fetching Reliance OHLC data from {lastBusDay}")
+            logger.debug("📊 Fetching Reliance OHLC data from %s", lastBusDay)
             
             ret = self.api.get_time_price_series(
                 exchange='NSE',  # Reliance is on NSE
                 token='2885',  # Reliance token
-                starttime=lastBusDay.timestamp(),
+                starttime=_midnight_ts(lastBusDay),
                 interval=5  # 5-minute intervals
             )
             
             if isinstance(ret, list) and ret:
-                print(f"✅ Retrieved {len(ret)} OHLC data points")
+                logger.debug("✅ Retrieved %d OHLC data points", len(ret))
                 return {"stat": "Ok", "data": ret}
             elif isinstance(ret, dict) and ret.get('stat') == 'Ok':
-                print(f"✅ Retrieved {len(ret.get('data', []))} data points")
+                logger.debug("✅ Retrieved %d data points", len(ret.get('data', [])))
                 return ret
             else:
-                print(f"❌ Failed to fetch data: {ret}")
+                logger.error("❌ Failed to fetch data: %s", ret)
                 return ret
                 
         except Exception as e:
-            print(f"❌ Error fetching OHLC data: {e}")
+            logger.error("❌ Error fetching OHLC data: %s", e)
             return None
     
+    @ttl_cache(ttl_fn=lambda params: params['interval'] * 60)
     def get_ohlc_data(self, token, exchange='NSE', interval=5, days=1):
         """
         Fetch OHLC data for any stock using its token
@@ -306,41 +460,133 @@ class FlattradeClient:
             exchange (str): Exchange name (default: 'NSE')
             interval (int): Time interval in minutes (1, 3, 5, 15, 30, 60)
             days (int): Number of days of data to fetch (default: 1)
+            cache (bool): Reuse a response from the current candle interval (default: True)
         
         Returns:
             dict: OHLC data response
         """
         if not self.is_connected:
-            print("❌ Not connected. Please run setup_session() first.")
+            logger.error("❌ Not connected. Please run setup_session() first.")
             return None
             
         try:
             # Set start time based on days parameter
-            start_date = datetime.datetime.today() - datetime.timedelta(days=days-1)
-            start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            start_date = datetime.date.today() - datetime.timedelta(days=days-1)
             
-            print(f"📊 Fetching OHLC data for token {token} from {start_date}, interval: {interval}min")
+            logger.debug("📊 Fetching OHLC data for token %s from %s, interval: %smin", token, start_date, interval)
             
             ret = self.api.get_time_price_series(
                 exchange=exchange,
                 token=token,
-                starttime=start_date.timestamp(),
+                starttime=_midnight_ts(start_date),
                 interval=interval
             )
             
             if isinstance(ret, list) and ret:
-                print(f"✅ Retrieved {len(ret)} OHLC data points for token {token}")
+                logger.debug("✅ Retrieved %d OHLC data points for token %s", len(ret), token)
                 return {"stat": "Ok", "data": ret}
             elif isinstance(ret, dict) and ret.get('stat') == 'Ok':
-                print(f"✅ Retrieved {len(ret.get('data', []))} data points for token {token}")
+                logger.debug("✅ Retrieved %d data points for token %s", len(ret.get('data', [])), token)
                 return ret
             else:
-                print(f"❌ Failed to fetch data for token {token}: {ret}")
+                logger.error("❌ Failed to fetch data for token %s: %s", token, ret)
                 return ret
                 
         except Exception as e:
-            print(f"❌ Error fetching OHLC data for token {token}: {e}")
+            logger.error("❌ Error fetching OHLC data for token %s: %s", token, e)
+            if isinstance(e, TRANSIENT_ERRORS):
+                return _transient_error(e)
             return None
+    
+    def get_ohlc_batch(self, tokens, exchange='NSE', interval=5, days=1, max_workers=10):
+        """
+        Fetch OHLC data for several tokens concurrently
+        
+        Args:
+            tokens (list): Stock tokens to fetch
+            exchange (str): Exchange name (default: 'NSE')
+            interval (int): Time interval in minutes (1, 3, 5, 15, 30, 60)
+            days (int): Number of days of data to fetch (default: 1)
+            max_workers (int): Maximum number of requests in flight (default: 10)
+        
+        Returns:
+            dict: OHLC data response keyed by token
+        """
+        if not tokens:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tokens))) as executor:
+            futures = [
+                executor.submit(self.get_ohlc_data, token, exchange, interval, days)
+                for token in tokens
+            ]
+            # get_ohlc_data returns None on failure, so result() does not raise
+            return {token: future.result() for token, future in zip(tokens, futures)}
+    
+    async def aget_ohlc_data(self, *args, **kwargs):
+        """
+        Async variant of get_ohlc_data for async views
+        
+        Runs the blocking call in a worker thread so the event loop stays free.
+        """
+        return await asyncio.to_thread(self.get_ohlc_data, *args, **kwargs)
+    
+    async def aget_live_quotes(self, *args, **kwargs):
+        """
+        Async variant of get_live_quotes for async views
+        """
+        return await asyncio.to_thread(self.get_live_quotes, *args, **kwargs)
+
+class AsyncFlattradeClient:
+    """
+    Asyncio front-end for FlattradeClient
+    
+    NorenApi only offers blocking calls, so each call runs in a worker thread
+    over the shared pooled HTTP session. Awaiting several calls together with
+    asyncio.gather overlaps their round-trips instead of paying them in turn.
+    """
+    
+    def __init__(self, userid, token, client=None):
+        """
+        Initialize async client with user credentials
+        
+        Args:
+            userid (str): Your Flattrade user ID
+            token (str): Daily generated token
+            client (FlattradeClient, optional): Existing client to wrap
+        """
+        self.client = client or FlattradeClient(userid, token)
+    
+    @property
+    def is_connected(self):
+        return self.client.is_connected
+    
+    async def setup_session(self):
+        return await asyncio.to_thread(self.client.setup_session)
+    
+    async def get_ohlc_data(self, token, exchange='NSE', interval=5, days=1):
+        return await self.client.aget_ohlc_data(token, exchange, interval, days)
+    
+    async def get_live_quotes(self, symbol='RELIANCE-EQ', exchange='NSE'):
+        return await self.client.aget_live_quotes(symbol, exchange)
+    
+    async def search_stock(self, search_text, use_local=True):
+        return await asyncio.to_thread(self.client.search_stock, search_text, use_local)
+    
+    async def get_ohlc_many(self, tokens, exchange='NSE', interval=5, days=1):
+        """
+        Fetch OHLC data for several tokens concurrently via FlattradeClient.get_ohlc_batch
+        
+        Args:
+            tokens (list): Stock tokens to fetch
+            exchange (str): Exchange name (default: 'NSE')
+            interval (int): Time interval in minutes
+            days (int): Number of days of data to fetch
+        
+        Returns:
+            dict: OHLC data response keyed by token
+        """
+        return await asyncio.to_thread(self.client.get_ohlc_batch, list(tokens), exchange, interval, days)
 
 # Example usage (you'll need to replace with your actual credentials)
 if __name__ == "__main__":
@@ -348,6 +594,8 @@ if __name__ == "__main__":
     USER_ID = "your_user_id"
     TOKEN = "your_daily_token"
     
+    logging.basicConfig(level=logging.INFO)
+    
     print("🚀 Starting Flattrade Client Demo")
     print("="*50)
     
@@ -77,6 +77,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Refreshes write from several pool threads at once: wait for the write lock
+        # instead of failing with "database is locked", and take it up front
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -117,6 +123,29 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'flattrade_client': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'stock_data': {
+            'handlers': ['console'],
+            'level': 'ERROR',
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
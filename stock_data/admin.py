@@ -1,6 +1,11 @@
 from django.contrib import admin
 from .models import Stock, OHLCData, UserSession, LiveQuote
 
+def is_changelist(request):
+    """Whether the admin request renders a changelist (list pages only need the displayed columns)"""
+    match = request.resolver_match
+    return match is not None and match.url_name.endswith('_changelist')
+
 @admin.register(Stock)
 class StockAdmin(admin.ModelAdmin):
     list_display = ['symbol', 'token', 'exchange', 'company_name', 'created_at']
@@ -15,6 +20,17 @@ class OHLCDataAdmin(admin.ModelAdmin):
     search_fields = ['stock__symbol']
     readonly_fields = ['created_at']
     date_hierarchy = 'timestamp'
+    ordering = ['-timestamp']
+    list_select_related = ('stock',)
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if is_changelist(request):
+            queryset = queryset.only(
+                'id', 'stock', 'stock__symbol', 'stock__token', 'timestamp',
+                'open_price', 'high_price', 'low_price', 'close_price', 'interval', 'created_at'
+            )
+        return queryset
 
 @admin.register(UserSession)
 class UserSessionAdmin(admin.ModelAdmin):
@@ -30,3 +46,13 @@ class LiveQuoteAdmin(admin.ModelAdmin):
     search_fields = ['stock__symbol']
     readonly_fields = ['timestamp']
     date_hierarchy = 'timestamp'
+    ordering = ['-timestamp']
+    list_select_related = ('stock',)
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if is_changelist(request):
+            queryset = queryset.only(
+                'id', 'stock', 'stock__symbol', 'stock__token', 'ltp', 'change', 'change_percent', 'timestamp'
+            )
+        return queryset
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class StockDataConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'stock_data'
+
+    def ready(self):
+        from . import signals
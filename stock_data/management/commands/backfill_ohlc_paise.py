@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from stock_data.models import OHLCData, to_paise
+
+
+class Command(BaseCommand):
+    help = 'Populate the integer paise price columns on existing OHLC rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+
+        while True:
+            rows = list(
+                OHLCData.objects.filter(close_px_paise__isnull=True)
+                .only('id', 'open_price', 'high_price', 'low_price', 'close_price')
+                .order_by('id')[:batch_size]
+            )
+            if not rows:
+                break
+
+            for row in rows:
+                row.open_px_paise = to_paise(row.open_price)
+                row.high_px_paise = to_paise(row.high_price)
+                row.low_px_paise = to_paise(row.low_price)
+                row.close_px_paise = to_paise(row.close_price)
+
+            OHLCData.objects.bulk_update(
+                rows,
+                ['open_px_paise', 'high_px_paise', 'low_px_paise', 'close_px_paise'],
+                batch_size=batch_size
+            )
+            updated += len(rows)
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled paise prices on {updated} OHLC rows'))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from stock_data.models import OHLCData, IndexOHLCData, LiveQuote, IndexQuote
+
+
+class Command(BaseCommand):
+    help = 'Build the covering OHLC index and BRIN timestamp indexes without blocking writes (PostgreSQL only)'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(f'These indexes need PostgreSQL, current database is {connection.vendor}')
+
+        for name, table, definition in self.index_definitions():
+            self.create_index(name, table, definition)
+
+    def index_definitions(self):
+        ohlc_table = OHLCData._meta.db_table
+        definitions = [
+            # Covering index: the chart read in get_ohlc_rows_values is served by an index-only scan
+            (
+                'ohlc_cover_idx', ohlc_table,
+                'USING btree (stock_id, "interval", "timestamp" DESC) '
+                'INCLUDE (open_price, high_price, low_price, close_price, atm, volume)'
+            ),
+        ]
+        # BRIN for time-range scans: the timestamp columns are append-only and increasing,
+        # so the index is tiny and near-free to maintain
+        for model in (OHLCData, IndexOHLCData, LiveQuote, IndexQuote):
+            table = model._meta.db_table
+            definitions.append((
+                f'{table}_ts_brin', table,
+                'USING brin ("timestamp") WITH (pages_per_range = 32)'
+            ))
+        return definitions
+
+    def create_index(self, name, table, definition):
+        # CONCURRENTLY cannot run inside a transaction, so each statement autocommits
+        with connection.cursor() as cursor:
+            # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+            cursor.execute(
+                'SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s',
+                [name]
+            )
+            row = cursor.fetchone()
+            if row is not None and row[0]:
+                self.stdout.write(f'{name} already exists')
+                return
+            if row is not None:
+                cursor.execute(f'DROP INDEX CONCURRENTLY {name}')
+
+            cursor.execute(f'CREATE INDEX CONCURRENTLY {name} ON {table} {definition}')
+
+        self.stdout.write(self.style.SUCCESS(f'Created {name} on {table}'))
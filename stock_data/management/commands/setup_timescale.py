@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from stock_data.models import OHLCData, IndexOHLCData
+
+
+class Command(BaseCommand):
+    help = 'Convert the OHLC tables into TimescaleDB hypertables partitioned by timestamp (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-days', type=int, default=7)
+        parser.add_argument('--compress-after-days', type=int, default=30)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(f'TimescaleDB needs PostgreSQL, current database is {connection.vendor}')
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb'")
+            if cursor.fetchone() is None:
+                raise CommandError('The timescaledb extension is not available on this server')
+
+        for model, segment_column in ((OHLCData, 'stock_id'), (IndexOHLCData, 'index_id')):
+            self.convert_table(
+                model._meta.db_table,
+                segment_column,
+                options['chunk_days'],
+                options['compress_after_days']
+            )
+
+    def convert_table(self, table, segment_column, chunk_days, compress_after_days):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS timescaledb')
+            cursor.execute(
+                'SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = %s',
+                [table]
+            )
+            if cursor.fetchone() is not None:
+                self.stdout.write(f'{table} is already a hypertable')
+                return
+
+            # Every unique index on a hypertable must contain the partitioning column
+            cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT {table}_pkey')
+            cursor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, timestamp)')
+
+            cursor.execute(
+                f"SELECT create_hypertable('{table}', 'timestamp', "
+                f"chunk_time_interval => INTERVAL '{chunk_days} days', migrate_data => true)"
+            )
+            cursor.execute(
+                f"ALTER TABLE {table} SET (timescaledb.compress, "
+                f"timescaledb.compress_segmentby = '{segment_column}, interval', "
+                f"timescaledb.compress_orderby = 'timestamp DESC')"
+            )
+            cursor.execute(
+                f"SELECT add_compression_policy('{table}', INTERVAL '{compress_after_days} days')"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Converted {table} into a hypertable'))
@@ -9,6 +9,20 @@ def calculate_atm(price):
     price_float = float(price)
     return Decimal(str(round(price_float / 50) * 50))
 
+def stock_cache_key(symbol):
+    """Django cache key for a Stock looked up by symbol"""
+    return f"stock:{symbol.replace(' ', '_')}"
+
+def index_cache_key(symbol):
+    """Django cache key for an Index looked up by symbol"""
+    return f"index:{symbol.replace(' ', '_')}"
+
+def to_paise(price):
+    """Convert a rupee price to integer paise for fast integer aggregates"""
+    if price is None:
+        return None
+    return int((Decimal(str(price)) * 100).to_integral_value())
+
 class Stock(models.Model):
     """Model to store stock information"""
     symbol = models.CharField(max_length=50, unique=True)
@@ -39,6 +53,11 @@ class OHLCData(models.Model):
     low_price = models.DecimalField(max_digits=10, decimal_places=2)
     close_price = models.DecimalField(max_digits=10, decimal_places=2)
     atm = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)  # ATM based on close price
+    # Prices in integer paise for analytical queries (Max/Min/Avg without numeric arithmetic)
+    open_px_paise = models.BigIntegerField(null=True, blank=True)
+    high_px_paise = models.BigIntegerField(null=True, blank=True)
+    low_px_paise = models.BigIntegerField(null=True, blank=True)
+    close_px_paise = models.BigIntegerField(null=True, blank=True)
     volume = models.BigIntegerField(default=0)
     interval = models.IntegerField(default=5)  # Interval in minutes
     created_at = models.DateTimeField(auto_now_add=True)
@@ -49,10 +68,13 @@ class OHLCData(models.Model):
     class Meta:
         verbose_name = "OHLC Data"
         verbose_name_plural = "OHLC Data"
-        ordering = ['-timestamp']
-        unique_together = ['stock', 'timestamp', 'interval']
+        # Column order matches the (stock, interval, timestamp range) lookup that skips stored candles
+        constraints = [
+            models.UniqueConstraint(fields=['stock', 'interval', 'timestamp'], name='uniq_ohlc_stock_interval_ts'),
+        ]
+        # B-tree on timestamp for the dashboard's newest-first reads. The covering ohlc_cover_idx
+        # and the BRIN timestamp index are PostgreSQL-only and built by the setup_pg_indexes command.
         indexes = [
-            models.Index(fields=['stock', 'interval', '-timestamp']),
             models.Index(fields=['timestamp']),
         ]
 
@@ -94,6 +116,9 @@ class Index(models.Model):
         verbose_name = "Index"
         verbose_name_plural = "Indices"
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['symbol']),
+        ]
 
 class IndexOHLCData(models.Model):
     """Model to store OHLC data for indices"""
@@ -113,12 +138,11 @@ class IndexOHLCData(models.Model):
     class Meta:
         verbose_name = "Index OHLC Data"
         verbose_name_plural = "Index OHLC Data"
-        ordering = ['-timestamp']
-        unique_together = ['index', 'timestamp', 'interval']
-        indexes = [
-            models.Index(fields=['index', 'interval', '-timestamp']),
-            models.Index(fields=['timestamp']),
+        constraints = [
+            models.UniqueConstraint(fields=['index', 'interval', 'timestamp'], name='uniq_index_ohlc_index_interval_ts'),
         ]
+        # The unique constraint's index also serves the (index, interval, latest timestamps) reads;
+        # time-range scans use the BRIN index built by setup_pg_indexes on PostgreSQL
 
 class IndexQuote(models.Model):
     """Model to store live index quotes (no volume data)"""
@@ -138,10 +162,9 @@ class IndexQuote(models.Model):
     class Meta:
         verbose_name = "Index Quote"
         verbose_name_plural = "Index Quotes"
-        ordering = ['-timestamp']
+        # Time-range scans use the BRIN index built by setup_pg_indexes on PostgreSQL
         indexes = [
             models.Index(fields=['index', '-timestamp']),
-            models.Index(fields=['timestamp']),
         ]
 
 class LiveQuote(models.Model):
@@ -163,7 +186,7 @@ class LiveQuote(models.Model):
     class Meta:
         verbose_name = "Live Quote"
         verbose_name_plural = "Live Quotes"
-        ordering = ['-timestamp']
+        # B-tree on timestamp for the dashboard's newest-first reads; BRIN comes from setup_pg_indexes
         indexes = [
             models.Index(fields=['stock', '-timestamp']),
             models.Index(fields=['timestamp']),
@@ -2,30 +2,104 @@
 Django services for Flattrade API integration
 """
 
-import sys
-import os
-import json
 import logging
 import asyncio
+import atexit
+import functools
+import itertools
+import random
+import threading
+import time
 import concurrent.futures
 from datetime import datetime, timedelta
 from decimal import Decimal
 from django.utils import timezone
 from django.conf import settings
 from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast
 
-# Add the project root to Python path to import flattrade_client
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from flattrade_client import FlattradeClient
+# flattrade_client and credentials sit next to the ohlc_project package, so the
+# project root is already on sys.path whenever Django settings can be imported
+from flattrade_client import FlattradeClient, RATE_LIMIT_MARKERS
 from credentials import USER_ID, TOKEN
-from .models import Stock, OHLCData, UserSession, LiveQuote, Index, IndexOHLCData, IndexQuote, calculate_atm
+from .models import Stock, OHLCData, UserSession, LiveQuote, Index, IndexOHLCData, IndexQuote, calculate_atm, to_paise, stock_cache_key, index_cache_key
 
 # Singleton service instance
 _service_instance = None
+_SERVICE_LOCK = threading.Lock()
+
+# Worker threads shared by every fan-out of blocking Flattrade API calls
+_API_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=10, thread_name_prefix='flattrade-api')
+atexit.register(_API_POOL.shutdown, wait=False)
+
+# Seconds a view waits for calls it runs in parallel on _API_POOL
+API_PARALLEL_TIMEOUT = 10
+
+# Cached dashboard context, dropped whenever new stock candles are stored
+DASHBOARD_CACHE_KEY = 'dashboard:ctx:v1'
+
+# Refreshes running in this process, keyed so identical concurrent requests share one call
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+# Seconds another process is kept from starting the same refresh
+REFRESH_LOCK_TIMEOUT = 2
+
+# Authenticated client shared by every FlattradeService in this process
+_CLIENT_SINGLETON = None
+_CLIENT_EXPIRES_AT = None
+_CLIENT_LOCK = threading.Lock()
+
+# Rows per INSERT statement when bulk saving OHLC data
+OHLC_BULK_BATCH_SIZE = 500
+
+# Seconds a Stock or Index row stays in the Django cache
+STOCK_CACHE_TTL = 24 * 60 * 60
+
+# Symbols with this suffix are blacklisted/suspended and never stored
+BLACKLISTED_SUFFIX = '-BL'
+
+# Stock/Index columns the services and templates read; the rest are admin-only
+STOCK_CACHE_FIELDS = ('id', 'symbol', 'token', 'exchange', 'company_name')
+INDEX_CACHE_FIELDS = ('id', 'symbol', 'token', 'exchange', 'name')
 
-# Set up logging
-logging.basicConfig(level=logging.ERROR)
+# Seconds a live quote is served from the cache before calling the API again
+QUOTE_CACHE_TTL = 3
+
+# Seconds an index quote is cached, and the most a concurrent request waits for it
+INDEX_QUOTE_CACHE_TTL = 300
+INDEX_QUOTE_LOCK_TIMEOUT = 5
+
+# Minimum seconds between stored LiveQuote snapshots for the same symbol
+LIVE_QUOTE_WRITE_INTERVAL = 5
+
+# Live quote cache hit/miss counters for this process; next() on a count is atomic
+_QUOTE_CACHE_HITS = itertools.count(1)
+_QUOTE_CACHE_MISSES = itertools.count(1)
+
+# Exponential backoff for Flattrade API calls: base * 2**attempt seconds, capped, plus jitter
+API_MAX_RETRIES = 3
+API_BACKOFF_BASE = 0.5
+API_BACKOFF_CAP = 4.0
+
+# No retry starts later than this many seconds into a call, so the last attempt
+# still has time to finish inside run_parallel's API_PARALLEL_TIMEOUT
+API_RETRY_BUDGET = API_PARALLEL_TIMEOUT / 2
+
+# NSE closing time in the project time zone; sessions expire at the next close
+MARKET_CLOSE_TIME = {'hour': 15, 'minute': 30, 'second': 0, 'microsecond': 0}
+ONE_DAY = timedelta(days=1)
+
+# Distinct API price strings kept parsed; Decimal is immutable so instances are shared
+DECIMAL_CACHE_SIZE = 4096
+_DEC_ZERO = Decimal(0)
+
+# Noren candle times are exchange local time, i.e. the project TIME_ZONE
+OHLC_TZ = timezone.get_default_timezone()
+
+# Set up logging, levels and handlers come from settings.LOGGING
 logger = logging.getLogger(__name__)
 
 # Hardcoded mapping for major indices (verified NSE tokens 2025)
@@ -92,6 +166,168 @@ MAJOR_INDICES = {
     }
 }
 
+# NSE (symbol, token) pairs listed as popular stocks
+POPULAR_STOCKS = (
+    ('RELIANCE-EQ', '2885'),
+    ('TCS-EQ', '11536'),
+    ('HDFCBANK-EQ', '1333'),
+    ('ICICIBANK-EQ', '4963'),
+    ('HINDUNILVR-EQ', '356'),
+    ('INFY-EQ', '1594'),
+    ('ITC-EQ', '424'),
+    ('KOTAKBANK-EQ', '1922'),
+    ('LT-EQ', '2939'),
+    ('AXISBANK-EQ', '5900'),
+)
+
+# Display names for index symbols that don't title-case cleanly
+_INDEX_NAME_MAP = {
+    'NIFTY': 'Nifty 50',
+    'NIFTY_BANK': 'Nifty Bank',
+    'NIFTY_NEXT_50': 'Nifty Next 50',
+    'NIFTY_100': 'Nifty 100',
+    'NIFTY_IT': 'Nifty IT',
+    'NIFTY_AUTO': 'Nifty Auto',
+    'NIFTY_FMCG': 'Nifty FMCG',
+    'NIFTY_PHARMA': 'Nifty Pharma',
+}
+
+# Lowercased (symbol, name) of each major index, matched against search text
+_MAJOR_INDICES_SEARCH = tuple(
+    (symbol.lower(), info['name'].lower(), symbol, info)
+    for symbol, info in MAJOR_INDICES.items()
+)
+
+# Every 2-character substring of a major index symbol/name -> the entries containing it.
+# Any text containing the search string also contains its first two characters, so
+# only those entries need the full substring check.
+_MAJOR_INDICES_BIGRAMS = {}
+for _entry in _MAJOR_INDICES_SEARCH:
+    for _text in _entry[:2]:
+        for _pos in range(len(_text) - 1):
+            _bucket = _MAJOR_INDICES_BIGRAMS.setdefault(_text[_pos:_pos + 2], [])
+            if _entry not in _bucket:
+                _bucket.append(_entry)
+_MAJOR_INDICES_BIGRAMS = {bigram: tuple(entries) for bigram, entries in _MAJOR_INDICES_BIGRAMS.items()}
+del _entry, _text, _pos, _bucket
+
+def _is_transient_response(result):
+    """Check if a client response is a failure worth retrying"""
+    if not isinstance(result, dict) or result.get('stat') == 'Ok':
+        return False
+    if result.get('transient'):
+        return True
+    emsg = str(result.get('emsg', '')).lower()
+    return any(marker in emsg for marker in RATE_LIMIT_MARKERS)
+
+def _shared_client():
+    """The process-wide client, or None if it is missing, disconnected or expired"""
+    client = _CLIENT_SINGLETON
+    if client is not None and client.is_connected and timezone.now() < _CLIENT_EXPIRES_AT:
+        return client
+    return None
+
+def next_market_close():
+    """Next NSE market close (3:30 PM in the project time zone, IST)"""
+    now = timezone.localtime()
+    market_close = now.replace(**MARKET_CLOSE_TIME)
+    if market_close <= now:
+        market_close += ONE_DAY
+    return market_close
+
+def get_cached_stock(symbol):
+    """
+    Get a Stock by symbol, served from the Django cache when possible.
+    Symbol -> stock rows practically never change, so they are kept for a day.
+    Raises Stock.DoesNotExist like Stock.objects.get().
+    """
+    key = stock_cache_key(symbol)
+    stock = cache.get(key)
+    if stock is None:
+        stock = Stock.objects.only(*STOCK_CACHE_FIELDS).get(symbol=symbol)
+        cache.set(key, stock, STOCK_CACHE_TTL)
+    return stock
+
+def get_cached_index(symbol):
+    """
+    Get an Index by symbol, served from the Django cache when possible.
+    Raises Index.DoesNotExist / MultipleObjectsReturned like Index.objects.get().
+    """
+    key = index_cache_key(symbol)
+    index = cache.get(key)
+    if index is None:
+        index = Index.objects.only(*INDEX_CACHE_FIELDS).get(symbol=symbol)
+        cache.set(key, index, STOCK_CACHE_TTL)
+    return index
+
+def local_scrip_lookup(search_text, limit=20):
+    """Find already known stocks, shaped like searchscrip results"""
+    stocks = Stock.objects.filter(
+        Q(symbol__istartswith=search_text) | Q(company_name__icontains=search_text)
+    ).values('symbol', 'token', 'exchange', 'company_name')[:limit]
+    return [
+        {
+            'tsym': stock['symbol'],
+            'token': stock['token'],
+            'exch': stock['exchange'],
+            'search_exchange': stock['exchange'],
+            'cname': stock['company_name'],
+        }
+        for stock in stocks
+    ]
+
+@functools.lru_cache(maxsize=DECIMAL_CACHE_SIZE, typed=True)
+def _to_decimal(value):
+    """
+    Decimal from an API price field. Noren sends strings, which Decimal parses
+    directly; numbers go through str() so floats don't carry binary noise.
+    Intraday prices repeat across candles, so parsed values are memoized.
+    """
+    if isinstance(value, str):
+        return Decimal(value) if value else _DEC_ZERO
+    return Decimal(str(value)) if value is not None else _DEC_ZERO
+
+def _fast_parse_ts(value):
+    """
+    Parse a Noren 'dd-mm-YYYY HH:MM:SS' time by slicing fixed positions.
+    Raises ValueError (or IndexError) for anything not in that exact shape.
+    """
+    if len(value) != 19 or value[2] != '-' or value[5] != '-' or value[13] != ':':
+        raise ValueError(f"unexpected timestamp format: {value!r}")
+    return datetime(
+        int(value[6:10]), int(value[3:5]), int(value[:2]),
+        int(value[11:13]), int(value[14:16]), int(value[17:19]),
+        tzinfo=OHLC_TZ
+    )
+
+def parse_ohlc_timestamps(data):
+    """
+    Parse the 'time' field of every candle
+    
+    Returns a list aligned with data holding aware datetimes, or None where
+    the timestamp could not be parsed.
+    """
+    timestamps = []
+    for item in data:
+        try:
+            timestamps.append(_fast_parse_ts(item.get('time', '')))
+        except (ValueError, IndexError, TypeError):
+            timestamps.append(None)
+    return timestamps
+
+def stored_ohlc_timestamps(queryset, timestamps):
+    """
+    Timestamps already stored in queryset between the first and last of
+    timestamps (None entries ignored), read with a single range query
+    """
+    valid = [ts for ts in timestamps if ts is not None]
+    if not valid:
+        return set()
+    return set(queryset.filter(
+        timestamp__gte=min(valid),
+        timestamp__lte=max(valid)
+    ).values_list('timestamp', flat=True))
+
 class FlattradeService:
     """Service class for handling Flattrade API operations"""
     
@@ -99,37 +335,65 @@ class FlattradeService:
         self.client = None
         self.user_id = USER_ID
         self.token = TOKEN
-        self.setup_client()
+        self._ensure_client()
         # Skip token validation on init for performance
     
+    def _ensure_client(self):
+        """
+        Make sure self.client is connected and its session has not expired
+        
+        Reuses the process-wide client when it is still valid and only logs in
+        again after it dropped or passed market close.
+        """
+        if self.client is not None and self.client is _shared_client():
+            return True
+        with _CLIENT_LOCK:
+            client = _shared_client()
+            if client is not None:
+                self.client = client
+                return True
+            if self.client is not None:
+                logger.warning("⚠️ Client not connected, attempting to reconnect...")
+            return self.setup_client()
+    
     def setup_client(self):
         """Initialize and authenticate Flattrade client"""
+        global _CLIENT_SINGLETON, _CLIENT_EXPIRES_AT
         try:
             logger.info(f"🔄 Setting up Flattrade client for user: {self.user_id}")
-            self.client = FlattradeClient(self.user_id, self.token)
+            self.client = FlattradeClient(self.user_id, self.token, local_lookup=local_scrip_lookup)
             connection_result = self.client.setup_session()
             
             logger.info(f"📡 Connection result: {connection_result}")
             logger.info(f"🔗 Client connected status: {self.client.is_connected}")
             
             if self.client.is_connected:
+                expires_at = next_market_close()
+                _CLIENT_SINGLETON, _CLIENT_EXPIRES_AT = self.client, expires_at
+                
+                # Another worker may already have recorded this token for today
+                if UserSession.objects.filter(
+                    user_id=self.user_id,
+                    token=self.token,
+                    is_active=True,
+                    expires_at__gt=timezone.now()
+                ).exists():
+                    logger.info("♻️ Reusing active session from database")
+                    return True
+                
                 logger.info("✅ Client connected successfully, saving session...")
-                # Save or update session in database
-                session, created = UserSession.objects.get_or_create(
+                session_key = connection_result.get('susertoken', '') if isinstance(connection_result, dict) else ''
+                # Save or update session in database (user_id is unique)
+                session, created = UserSession.objects.update_or_create(
                     user_id=self.user_id,
                     defaults={
                         'token': self.token,
+                        'session_key': session_key,
                         'is_active': True,
-                        'expires_at': timezone.now() + timedelta(hours=8)  # Token expires in 8 hours
+                        'expires_at': expires_at  # Token is valid for the trading day
                     }
                 )
                 
-                if not created:
-                    session.token = self.token
-                    session.is_active = True
-                    session.expires_at = timezone.now() + timedelta(hours=8)
-                    session.save()
-                
                 logger.info(f"💾 Session {'created' if created else 'updated'} in database")
                 return True
             else:
@@ -137,22 +401,121 @@ class FlattradeService:
                 return False
                 
         except Exception as e:
-            logger.error(f"💥 Error setting up Flattrade client: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("💥 Error setting up Flattrade client: %s", e)
             return False
     
+    def _call_with_retry(self, fn, *args, max_retries=API_MAX_RETRIES, **kwargs):
+        """
+        Call a FlattradeClient method, backing off and retrying on transient failures
+        
+        Only exceptions and responses marked transient (network errors, undecodable
+        bodies, rate-limit messages) are retried. None and other Not_Ok responses
+        are deterministic, e.g. not connected or unknown symbol, and return at once.
+        No retry is started after API_RETRY_BUDGET seconds.
+        
+        Args:
+            fn: bound client method to call
+            max_retries (int): retries after the first attempt
+            
+        Returns:
+            The last result from fn, or None if every attempt raised
+        """
+        result = None
+        deadline = time.monotonic() + API_RETRY_BUDGET
+        for attempt in range(max_retries + 1):
+            try:
+                result = fn(*args, **kwargs)
+                if not _is_transient_response(result):
+                    return result
+                logger.warning("%s failed on attempt %d: %s", fn.__name__, attempt + 1, result.get('emsg'))
+            except Exception as e:
+                result = None
+                logger.warning("%s failed on attempt %d: %s", fn.__name__, attempt + 1, e)
+            
+            if attempt == max_retries:
+                break
+            delay = min(API_BACKOFF_CAP, API_BACKOFF_BASE * 2 ** attempt) + random.uniform(0, API_BACKOFF_BASE)
+            if time.monotonic() + delay > deadline:
+                logger.warning("Giving up on %s: retry budget of %ss spent", fn.__name__, API_RETRY_BUDGET)
+                break
+            logger.info("Retrying %s in %.2fs", fn.__name__, delay)
+            time.sleep(delay)
+        return result
+    
+    def get_or_create_stocks_bulk(self, rows):
+        """
+        Get or create many stocks from the cache, then one SELECT and at most one INSERT
+        
+        Args:
+            rows: iterable of (symbol, token, exchange) tuples
+            
+        Returns:
+            dict mapping symbol to Stock for every row that could be saved
+        """
+        # Drop BL (blacklisted) symbols up front instead of per stock
+        rows = {
+            symbol: (token, exchange)
+            for symbol, token, exchange in rows
+            if not symbol.endswith(BLACKLISTED_SUFFIX)
+        }
+        if not rows:
+            return {}
+        
+        try:
+            cached = cache.get_many([stock_cache_key(symbol) for symbol in rows])
+            stocks = {
+                symbol: cached[stock_cache_key(symbol)]
+                for symbol in rows
+                if stock_cache_key(symbol) in cached
+            }
+            if len(stocks) == len(rows):
+                return stocks
+            
+            stocks.update(Stock.objects.only(*STOCK_CACHE_FIELDS).in_bulk(
+                [symbol for symbol in rows if symbol not in stocks], field_name='symbol'
+            ))
+            missing = [
+                Stock(
+                    symbol=symbol,
+                    token=token,
+                    exchange=exchange,
+                    company_name=self._generate_company_name(symbol, exchange)
+                )
+                for symbol, (token, exchange) in rows.items()
+                if symbol not in stocks
+            ]
+            if missing:
+                Stock.objects.bulk_create(missing, ignore_conflicts=True)
+                # ignore_conflicts leaves pks unset, so read the new rows back
+                stocks.update(Stock.objects.only(*STOCK_CACHE_FIELDS).in_bulk(
+                    [stock.symbol for stock in missing], field_name='symbol'
+                ))
+                logger.info(f"📝 Created {len(missing)} stocks in bulk")
+            
+            cache.set_many(
+                {stock_cache_key(symbol): stock for symbol, stock in stocks.items()},
+                STOCK_CACHE_TTL
+            )
+            return stocks
+        except Exception as e:
+            logger.exception("💥 Error bulk creating stocks: %s", e)
+            return {}
+    
     def get_or_create_stock(self, symbol, token, exchange='NSE', search_exchange=None):
         """Get or create stock in database"""
         try:
             # Skip BL (blacklisted) stocks
-            if symbol.endswith('-BL'):
+            if symbol.endswith(BLACKLISTED_SUFFIX):
                 logger.warning(f"⚠️ Skipping BL stock: {symbol} (blacklisted/suspended)")
                 return None
             
             # Use search_exchange if provided (from multi-exchange search)
             actual_exchange = search_exchange or exchange
             
+            stock = cache.get(stock_cache_key(symbol))
+            if stock is not None:
+                return stock
+            
             logger.info(f"🏢 Getting/creating stock: {symbol}, token: {token}, exchange: {actual_exchange}")
             stock, created = Stock.objects.get_or_create(
                 symbol=symbol,
@@ -162,15 +525,16 @@ class FlattradeService:
                     'company_name': self._generate_company_name(symbol, actual_exchange)
                 }
             )
+            cache.set(stock_cache_key(symbol), stock, STOCK_CACHE_TTL)
             logger.info(f"📝 Stock {'created' if created else 'found'}: {stock}")
             return stock
         except Exception as e:
-            logger.error(f"💥 Error creating stock {symbol}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("💥 Error creating stock %s: %s", symbol, e)
             return None
     
-    def _generate_company_name(self, symbol, exchange):
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _generate_company_name(symbol, exchange):
         """Generate company name based on symbol and exchange"""
         if exchange in ['NSE_INDEX', 'INDICES']:
             # For indices, keep the name cleaner
@@ -179,20 +543,26 @@ class FlattradeService:
             # For stocks, remove -EQ suffix
             return symbol.replace('-EQ', '').replace('-', ' ').title()
     
-    def get_live_quote(self, symbol):
-        """Get live quote for a stock"""
+    def get_live_quote(self, symbol, refresh=False):
+        """Get live quote for a stock; refresh=True skips the quote cache"""
+        # The only quote cache: the client does not cache get_live_quotes responses
+        cache_key = f"quote:{symbol.replace(' ', '_')}"
+        live_quote = None if refresh else cache.get(cache_key)
+        if live_quote is not None:
+            logger.debug("⚡ Live quote cache hit for %s (hit #%d)", symbol, next(_QUOTE_CACHE_HITS))
+            return live_quote
+        logger.debug("Live quote cache miss for %s (miss #%d)", symbol, next(_QUOTE_CACHE_MISSES))
+        
         logger.info(f"📈 Getting live quote for: {symbol}")
         
-        if not self.client or not self.client.is_connected:
-            logger.warning("⚠️ Client not connected, attempting to reconnect...")
-            if not self.setup_client():
-                logger.error("❌ Failed to setup client for live quote")
-                return None
+        if not self._ensure_client():
+            logger.error("❌ Failed to setup client for live quote")
+            return None
         
         try:
             # Get stock from database first to determine exchange
             try:
-                stock = Stock.objects.get(symbol=symbol)
+                stock = get_cached_stock(symbol)
                 exchange = stock.exchange
                 logger.info(f"🔄 Found stock {symbol} with exchange {exchange}")
             except Stock.DoesNotExist:
@@ -201,9 +571,9 @@ class FlattradeService:
                 logger.info(f"🔄 Stock {symbol} not found in database, defaulting to NSE")
             
             logger.info(f"🔄 Calling API for live quotes: {symbol} on {exchange}")
-            quote_data = self.client.get_live_quotes(symbol, exchange)
+            quote_data = self._call_with_retry(self.client.get_live_quotes, symbol, exchange)
             
-            logger.info(f"📊 Raw quote response: {json.dumps(quote_data, indent=2, default=str)}")
+            logger.debug("📊 Raw quote response: %s", quote_data)
             
             if quote_data and quote_data.get('stat') == 'Ok':
                 logger.info("✅ Quote data received successfully")
@@ -215,20 +585,27 @@ class FlattradeService:
                 
                 if stock:
                     logger.info(f"📝 Creating live quote record for stock: {stock}")
-                    # Create live quote record
-                    ltp = Decimal(str(quote_data.get('lp', 0)))
-                    live_quote = LiveQuote.objects.create(
+                    # Build live quote record; timestamp is set here because unsaved
+                    # instances never get the auto_now_add value
+                    ltp = _to_decimal(quote_data.get('lp'))
+                    live_quote = LiveQuote(
                         stock=stock,
+                        timestamp=timezone.now(),
                         ltp=ltp,
-                        open_price=Decimal(str(quote_data.get('o', 0))),
-                        high_price=Decimal(str(quote_data.get('h', 0))),
-                        low_price=Decimal(str(quote_data.get('l', 0))),
-                        volume=int(quote_data.get('v', 0)),
-                        change=Decimal(str(quote_data.get('c', 0))),
-                        change_percent=Decimal(str(quote_data.get('prctyp', 0))),
+                        open_price=_to_decimal(quote_data.get('o')),
+                        high_price=_to_decimal(quote_data.get('h')),
+                        low_price=_to_decimal(quote_data.get('l')),
+                        volume=int(quote_data.get('v') or 0),
+                        change=_to_decimal(quote_data.get('c')),
+                        change_percent=_to_decimal(quote_data.get('prctyp')),
                         atm=calculate_atm(ltp)
                     )
                     
+                    # Store at most one snapshot per symbol every LIVE_QUOTE_WRITE_INTERVAL seconds
+                    if cache.add(f"livequote_wrote:{symbol.replace(' ', '_')}", 1, LIVE_QUOTE_WRITE_INTERVAL):
+                        live_quote.save()
+                    
+                    cache.set(cache_key, live_quote, QUOTE_CACHE_TTL)
                     logger.info(f"✅ Live quote created: {live_quote}")
                     return live_quote
                 else:
@@ -237,25 +614,21 @@ class FlattradeService:
                 logger.error(f"❌ Quote API response error: {quote_data}")
                     
         except Exception as e:
-            logger.error(f"💥 Error getting live quote for {symbol}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("💥 Error getting live quote for %s: %s", symbol, e)
             return None
     
-    def get_ohlc_data(self, symbol, interval=5, days=1):
-        """Get OHLC data for a stock"""
+    def get_ohlc_data(self, symbol, interval=5, days=1, refresh=False):
+        """Get OHLC data for a stock; refresh=True skips the client response cache"""
         logger.info(f"📊 Getting OHLC data for: {symbol}, interval: {interval}")
         
-        if not self.client or not self.client.is_connected:
-            logger.warning("⚠️ Client not connected, attempting to reconnect...")
-            if not self.setup_client():
-                logger.error("❌ Failed to setup client for OHLC data")
-                return None
+        if not self._ensure_client():
+            logger.error("❌ Failed to setup client for OHLC data")
+            return None
         
         try:
             # Get the stock from database to get its token
             try:
-                stock = Stock.objects.get(symbol=symbol)
+                stock = get_cached_stock(symbol)
                 token = stock.token
                 logger.info(f"🔄 Found stock {symbol} with token {token}")
             except Stock.DoesNotExist:
@@ -264,14 +637,20 @@ class FlattradeService:
             
             # Use the generic OHLC method for any stock
             logger.info(f"🔄 Calling get_ohlc_data() for {symbol} (token: {token}, exchange: {stock.exchange})...")
-            ohlc_response = self.client.get_ohlc_data(
+            ohlc_response = self._call_with_retry(
+                self.client.get_ohlc_data,
                 token=token,
                 exchange=stock.exchange,
                 interval=interval,
-                days=days
+                days=days,
+                cache=not refresh
             )
             
-            logger.info(f"📈 Raw OHLC response: {json.dumps(ohlc_response, indent=2, default=str)}")
+            if ohlc_response:
+                logger.debug(
+                    "📈 OHLC response stat=%s rows=%d",
+                    ohlc_response.get('stat'), len(ohlc_response.get('data') or [])
+                )
             
             if ohlc_response and ohlc_response.get('stat') == 'Ok':
                 data = ohlc_response.get('data', [])
@@ -282,47 +661,59 @@ class FlattradeService:
                 
                 if stock:
                     ohlc_records = []
-                    successful_records = 0
                     skipped_records = 0
                     
-                    for i, item in enumerate(data):
-                        logger.debug(f"📦 Processing OHLC item {i+1}: {item}")
-                        
-                        # Parse timestamp
-                        timestamp_str = item.get('time', '')
-                        try:
-                            timestamp = datetime.strptime(timestamp_str, '%d-%m-%Y %H:%M:%S')
-                            timestamp = timezone.make_aware(timestamp)
-                            logger.debug(f"⏰ Parsed timestamp: {timestamp}")
-                        except ValueError as ve:
-                            logger.warning(f"⚠️ Skipping invalid timestamp '{timestamp_str}': {ve}")
+                    timestamps = parse_ohlc_timestamps(data)
+                    
+                    # One range query for candles already stored instead of a check per row
+                    existing_timestamps = stored_ohlc_timestamps(
+                        OHLCData.objects.filter(stock=stock, interval=interval),
+                        timestamps
+                    )
+                    if existing_timestamps and existing_timestamps.issuperset(ts for ts in timestamps if ts is not None):
+                        logger.info(f"📊 OHLC Summary: all {len(existing_timestamps)} candles already stored")
+                        return ohlc_records
+                    for item, timestamp in zip(data, timestamps):
+                        if timestamp is None:
+                            logger.warning("Skipping invalid timestamp '%s'", item.get('time', ''))
                             skipped_records += 1
-                            continue
-                        
-                        # Create OHLC record
-                        close_price = Decimal(str(item.get('intc', 0)))
-                        ohlc_record, created = OHLCData.objects.get_or_create(
+                    
+                    # Build OHLC records in one pass, saved below in a single batch
+                    prices = [
+                        (timestamp, _to_decimal(item.get('into')), _to_decimal(item.get('inth')),
+                         _to_decimal(item.get('intl')), _to_decimal(item.get('intc')), int(item.get('v') or 0))
+                        for item, timestamp in zip(data, timestamps)
+                        if timestamp is not None and timestamp not in existing_timestamps
+                    ]
+                    existing_records = len(data) - skipped_records - len(prices)
+                    ohlc_records = [
+                        OHLCData(
                             stock=stock,
                             timestamp=timestamp,
                             interval=interval,
-                            defaults={
-                                'open_price': Decimal(str(item.get('into', 0))),
-                                'high_price': Decimal(str(item.get('inth', 0))),
-                                'low_price': Decimal(str(item.get('intl', 0))),
-                                'close_price': close_price,
-                                'volume': int(item.get('v', 0)),
-                                'atm': calculate_atm(close_price)
-                            }
+                            open_price=open_price,
+                            high_price=high_price,
+                            low_price=low_price,
+                            close_price=close_price,
+                            open_px_paise=to_paise(open_price),
+                            high_px_paise=to_paise(high_price),
+                            low_px_paise=to_paise(low_price),
+                            close_px_paise=to_paise(close_price),
+                            volume=volume,
+                            atm=calculate_atm(close_price)
                         )
-                        
-                        if created:
-                            ohlc_records.append(ohlc_record)
-                            successful_records += 1
-                            logger.debug(f"✅ Created OHLC record: {ohlc_record}")
-                        else:
-                            logger.debug(f"📝 OHLC record already exists: {ohlc_record}")
+                        for timestamp, open_price, high_price, low_price, close_price, volume in prices
+                    ]
+                    
+                    # Rows already stored for (stock, timestamp, interval) are skipped by the unique constraint.
+                    # Every batch of OHLC_BULK_BATCH_SIZE rows goes out as one multi-row INSERT and all
+                    # batches commit together, so there is one commit per response rather than per row.
+                    if ohlc_records:
+                        with transaction.atomic():
+                            OHLCData.objects.bulk_create(ohlc_records, batch_size=OHLC_BULK_BATCH_SIZE, ignore_conflicts=True)
+                        cache.delete(DASHBOARD_CACHE_KEY)
                     
-                    logger.info(f"📊 OHLC Summary: {successful_records} new records, {skipped_records} skipped, {len(ohlc_records)} total new")
+                    logger.info(f"📊 OHLC Summary: {len(ohlc_records)} new records, {existing_records} already stored, {skipped_records} skipped")
                     return ohlc_records
                 else:
                     logger.error("❌ Failed to create/get stock for OHLC data")
@@ -330,25 +721,68 @@ class FlattradeService:
                 logger.error(f"❌ OHLC API response error: {ohlc_response}")
                     
         except Exception as e:
-            logger.error(f"💥 Error getting OHLC data for {symbol}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("💥 Error getting OHLC data for %s: %s", symbol, e)
             return None
     
+    def get_ohlc_rows_values(self, symbol, interval=5, days=1, refresh=False):
+        """
+        Refresh OHLC data for a stock and return the stored candles as plain dicts
+        
+        Args:
+            symbol: Stock symbol
+            interval: Candle interval in minutes
+            days: Number of trading days covered by the refresh
+            refresh: Skip the client response cache
+            
+        Returns:
+            List of dicts keyed timestamp/open/high/low/close/atm/volume, newest first,
+            or None if the refresh failed
+        """
+        if self.get_ohlc_data(symbol, interval, days, refresh=refresh) is None:
+            return None
+        
+        # Same window the client fetches: midnight of the first requested day onwards
+        since = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+        
+        # Projected and cast by the database, so no model instances or per-row float() calls.
+        # Filtering on stock_id with only these columns lets PostgreSQL answer from ohlc_cover_idx.
+        return list(
+            OHLCData.objects
+            .filter(stock_id=get_cached_stock(symbol).id, interval=interval, timestamp__gte=since)
+            .order_by('-timestamp')
+            .values(
+                'timestamp',
+                'volume',
+                open=Cast('open_price', FloatField()),
+                high=Cast('high_price', FloatField()),
+                low=Cast('low_price', FloatField()),
+                close=Cast('close_price', FloatField()),
+                atm=Cast('atm', FloatField())
+            )
+        )
+    
     def search_stocks(self, search_text):
-        """Search for stocks and indices with hardcoded mapping priority"""
-        if not self.client or not self.client.is_connected:
-            if not self.setup_client():
-                return []
+        """
+        Search for stocks and indices with hardcoded mapping priority
+        
+        Returns:
+            List of Index/Stock objects (empty if nothing matched), or None if the search failed
+        """
+        if not self._ensure_client():
+            return None
         
         try:
             results = []
+            seen_tokens = set()
             
             # First, check if search matches any hardcoded major indices
             search_lower = search_text.lower()
-            for symbol, info in MAJOR_INDICES.items():
-                if (search_lower in symbol.lower() or 
-                    search_lower in info['name'].lower()):
+            if len(search_lower) >= 2:
+                candidates = _MAJOR_INDICES_BIGRAMS.get(search_lower[:2], ())
+            else:
+                candidates = _MAJOR_INDICES_SEARCH
+            for symbol_lower, name_lower, symbol, info in candidates:
+                if search_lower in symbol_lower or search_lower in name_lower:
                     
                     index = self.get_or_create_index(
                         symbol=symbol,
@@ -357,12 +791,14 @@ class FlattradeService:
                     )
                     if index:
                         results.append(index)
-                        logger.info(f"🎯 Found hardcoded index: {symbol}")
+                        seen_tokens.add(index.token)
+                        logger.info("Found hardcoded index: %s", symbol)
             
             # Then do API search for additional results
-            search_result = self.client.search_stock(search_text)
+            search_result = self._call_with_retry(self.client.search_stock, search_text)
             
             if search_result and search_result.get('stat') == 'Ok':
+                pending_stocks = []
                 for item in search_result.get('values', []):
                     symbol = item.get('tsym', '')
                     token = item.get('token', '')
@@ -370,8 +806,8 @@ class FlattradeService:
                     instname = item.get('instname', '')
                     
                     if symbol and token:
-                        # Skip if we already have this from hardcoded mapping
-                        if any(hasattr(r, 'token') and r.token == token for r in results):
+                        # Skip if we already have this from hardcoded mapping or an earlier hit
+                        if token in seen_tokens:
                             continue
                             
                         if instname == 'UNDIND' or 'NIFTY' in symbol.upper():
@@ -383,45 +819,40 @@ class FlattradeService:
                             )
                             if index:
                                 results.append(index)
+                                seen_tokens.add(index.token)
                         else:
-                            # Handle as stock
-                            stock = self.get_or_create_stock(
-                                symbol=symbol, 
-                                token=token, 
-                                search_exchange=search_exchange
-                            )
-                            if stock:
-                                results.append(stock)
+                            # Handle as stock, saved in one batch below; keep its slot in results
+                            pending_stocks.append((symbol, token, search_exchange))
+                            seen_tokens.add(token)
+                            results.append(symbol)
+                
+                stocks = self.get_or_create_stocks_bulk(pending_stocks)
+                results = [
+                    stocks.get(r) if isinstance(r, str) else r
+                    for r in results
+                ]
+                results = [r for r in results if r is not None]
                 
                 logger.info(f"🔍 Search for '{search_text}' returned {len(results)} results")
                 return results
+            
+            if search_result and not _is_transient_response(search_result):
+                # The API found nothing; only the hardcoded index matches remain
+                return results
+            
+            logger.error(f"❌ Search API response error: {search_result}")
+            return None
                 
         except Exception as e:
-            logger.error(f"💥 Error searching stocks: {e}")
-            return []
+            logger.exception("💥 Error searching stocks: %s", e)
+            return None
     
     def get_popular_stocks(self):
         """Get list of popular stocks"""
-        popular_symbols = [
-            ('RELIANCE-EQ', '2885'),
-            ('TCS-EQ', '11536'),
-            ('HDFCBANK-EQ', '1333'),
-            ('ICICIBANK-EQ', '4963'),
-            ('HINDUNILVR-EQ', '356'),
-            ('INFY-EQ', '1594'),
-            ('ITC-EQ', '424'),
-            ('KOTAKBANK-EQ', '1922'),
-            ('LT-EQ', '2939'),
-            ('AXISBANK-EQ', '5900')
-        ]
-        
-        stocks = []
-        for symbol, token in popular_symbols:
-            stock = self.get_or_create_stock(symbol, token)
-            if stock:
-                stocks.append(stock)
-        
-        return stocks
+        stocks = self.get_or_create_stocks_bulk(
+            [(symbol, token, 'NSE') for symbol, token in POPULAR_STOCKS]
+        )
+        return [stocks[symbol] for symbol, _ in POPULAR_STOCKS if symbol in stocks]
     
     def get_or_create_index(self, symbol, token, name=None, index_type='EQUITY'):
         """Get or create index in database with hardcoded mapping priority"""
@@ -436,10 +867,11 @@ class FlattradeService:
                 name = major_index_info['name']
                 logger.info(f"📋 Using hardcoded mapping for {symbol}: token={token}, name={name}")
             
+            # token is unique, so the lookup is a single index probe
             index, created = Index.objects.get_or_create(
-                symbol=symbol,
                 token=token,
                 defaults={
+                    'symbol': symbol,
                     'name': name or self._generate_index_name(symbol),
                     'exchange': 'NSE',
                     'index_type': index_type,
@@ -449,22 +881,14 @@ class FlattradeService:
             logger.info(f"📝 Index {'created' if created else 'found'}: {index}")
             return index
         except Exception as e:
-            logger.error(f"💥 Error creating index {symbol}: {e}")
+            logger.exception("💥 Error creating index %s: %s", symbol, e)
             return None
     
-    def _generate_index_name(self, symbol):
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _generate_index_name(symbol):
         """Generate readable index name from symbol"""
-        name_mapping = {
-            'NIFTY': 'Nifty 50',
-            'NIFTY_BANK': 'Nifty Bank',
-            'NIFTY_NEXT_50': 'Nifty Next 50',
-            'NIFTY_100': 'Nifty 100',
-            'NIFTY_IT': 'Nifty IT',
-            'NIFTY_AUTO': 'Nifty Auto',
-            'NIFTY_FMCG': 'Nifty FMCG',
-            'NIFTY_PHARMA': 'Nifty Pharma',
-        }
-        return name_mapping.get(symbol, symbol.replace('_', ' ').title())
+        return _INDEX_NAME_MAP.get(symbol, symbol.replace('_', ' ').title())
     
     def get_index_by_symbol(self, symbol):
         """Get index by symbol, using hardcoded mapping if available"""
@@ -473,9 +897,9 @@ class FlattradeService:
                 # Use hardcoded mapping
                 major_index_info = MAJOR_INDICES[symbol]
                 index, created = Index.objects.get_or_create(
-                    symbol=symbol,
                     token=major_index_info['token'],
                     defaults={
+                        'symbol': symbol,
                         'name': major_index_info['name'],
                         'exchange': major_index_info['exchange'],
                         'index_type': 'EQUITY',
@@ -485,7 +909,7 @@ class FlattradeService:
                 return index
             else:
                 # Fall back to database lookup
-                return Index.objects.get(symbol=symbol)
+                return get_cached_index(symbol)
         except Index.DoesNotExist:
             logger.error(f"Index {symbol} not found")
             return None
@@ -494,6 +918,36 @@ class FlattradeService:
             # Return the first one as fallback
             return Index.objects.filter(symbol=symbol).first()
     
+    def _validate_index_token(self, symbol, info):
+        """Probe one major index token with get_quotes, returns (symbol, result)"""
+        token = info['token']
+        try:
+            logger.debug("🔍 Testing token %s for %s...", token, symbol)
+            
+            # Test token by trying to get quotes
+            quote_response = self.client.api.get_quotes(exchange=info['exchange'], token=token)
+            
+            if quote_response and quote_response.get('stat') == 'Ok':
+                logger.info("%s token %s is valid - maps to %s", symbol, token, quote_response.get('tsym'))
+                return symbol, {
+                    'status': 'valid',
+                    'token': token,
+                    'name': quote_response.get('tsym', 'Unknown')
+                }
+            logger.error("%s token %s is invalid: %s", symbol, token, quote_response)
+            return symbol, {
+                'status': 'invalid',
+                'token': token,
+                'error': quote_response
+            }
+        except Exception as e:
+            logger.exception("Error validating %s token %s: %s", symbol, token, e)
+            return symbol, {
+                'status': 'error',
+                'token': token,
+                'error': str(e)
+            }
+    
     def validate_major_indices_tokens(self):
         """Validate that major indices tokens work with the API"""
         if not self.client or not self.client.is_connected:
@@ -501,38 +955,11 @@ class FlattradeService:
             return
         
         logger.info("🔍 Validating major indices tokens...")
-        validation_results = {}
-        
-        for symbol, info in MAJOR_INDICES.items():
-            try:
-                token = info['token']
-                logger.debug(f"🔍 Testing token {token} for {symbol}...")
-                
-                # Test token by trying to get quotes
-                quote_response = self.client.api.get_quotes(exchange=info['exchange'], token=token)
-                
-                if quote_response and quote_response.get('stat') == 'Ok':
-                    validation_results[symbol] = {
-                        'status': 'valid',
-                        'token': token,
-                        'name': quote_response.get('tsym', 'Unknown')
-                    }
-                    logger.info(f"✅ {symbol} token {token} is valid - maps to {quote_response.get('tsym')}")
-                else:
-                    validation_results[symbol] = {
-                        'status': 'invalid',
-                        'token': token,
-                        'error': quote_response
-                    }
-                    logger.error(f"❌ {symbol} token {token} is invalid: {quote_response}")
-                    
-            except Exception as e:
-                validation_results[symbol] = {
-                    'status': 'error',
-                    'token': token,
-                    'error': str(e)
-                }
-                logger.error(f"💥 Error validating {symbol} token {token}: {e}")
+        # Each probe is a blocking get_quotes call, so run them side by side
+        validation_results = dict(_API_POOL.map(
+            lambda item: self._validate_index_token(*item),
+            MAJOR_INDICES.items()
+        ))
         
         # Log summary
         valid_count = sum(1 for r in validation_results.values() if r['status'] == 'valid')
@@ -541,24 +968,56 @@ class FlattradeService:
         
         return validation_results
     
-    def get_index_quote(self, symbol):
-        """Get live quote for an index using hardcoded mapping first"""
+    def get_index_quote(self, symbol, refresh=False):
+        """Get live quote for an index using hardcoded mapping first; refresh=True skips the quote cache"""
         logger.info(f"📊 Getting index quote for: {symbol}")
         
-        if not self.client or not self.client.is_connected:
-            logger.warning("⚠️ Client not connected, attempting to reconnect...")
-            if not self.setup_client():
-                logger.error("❌ Failed to setup client for index quote")
-                return None
+        if not self._ensure_client():
+            logger.error("❌ Failed to setup client for index quote")
+            return None
         
-        try:
-            # Check cache first (sanitize symbol for cache key)
-            cache_key = f"index_quote_{symbol.replace(' ', '_')}"
+        # Check cache first (sanitize symbol for cache key)
+        cache_key = f"index_quote_{symbol.replace(' ', '_')}"
+        if refresh:
+            # Drop the old quote so neither this call nor concurrent waiters are served it
+            cache.delete(cache_key)
+        else:
             cached_quote = cache.get(cache_key)
             if cached_quote:
                 logger.info(f"📋 Using cached quote for {symbol}")
-                return cached_quote
-            
+                return IndexQuote(**cached_quote)
+        
+        # Only one caller per symbol fetches; the rest wait briefly for its result
+        lock_key = f"{cache_key}_lock"
+        got_lock = cache.add(lock_key, 1, INDEX_QUOTE_LOCK_TIMEOUT)
+        deadline = time.monotonic() + INDEX_QUOTE_LOCK_TIMEOUT
+        while not got_lock and time.monotonic() < deadline:
+            time.sleep(0.1)
+            cached_quote = cache.get(cache_key)
+            if cached_quote:
+                logger.info(f"📋 Using quote fetched by another request for {symbol}")
+                return IndexQuote(**cached_quote)
+            # Lock released without a cached quote means the fetch failed; one waiter takes over
+            got_lock = cache.add(lock_key, 1, INDEX_QUOTE_LOCK_TIMEOUT)
+        if not got_lock:
+            logger.warning(f"⚠️ Timed out waiting for {symbol} quote, fetching it directly")
+        
+        try:
+            index_quote = self._fetch_index_quote(symbol)
+            if index_quote:
+                # Cache the plain field values for 5 minutes, not the model instance
+                cache.set(cache_key, {
+                    field.attname: getattr(index_quote, field.attname)
+                    for field in IndexQuote._meta.concrete_fields
+                }, INDEX_QUOTE_CACHE_TTL)
+            return index_quote
+        finally:
+            if got_lock:
+                cache.delete(lock_key)
+    
+    def _fetch_index_quote(self, symbol):
+        """Call the API for an index quote and store it as an IndexQuote row"""
+        try:
             # Use hardcoded mapping if available
             if symbol in MAJOR_INDICES:
                 major_index_info = MAJOR_INDICES[symbol]
@@ -567,13 +1026,12 @@ class FlattradeService:
                 
                 # Get quotes directly by token (more reliable)
                 quote_data = self.client.api.get_quotes(exchange=major_index_info['exchange'], token=token)
-                logger.info(f"📊 Direct token call response: {json.dumps(quote_data, indent=2, default=str)}")
             else:
                 # Fall back to search-based approach
                 logger.info(f"🔄 Using search-based approach for {symbol}")
                 quote_data = self.client.get_live_quotes(symbol)
             
-            logger.info(f"📊 Raw index quote response: {json.dumps(quote_data, indent=2, default=str)}")
+            logger.debug("📊 Raw index quote response: %s", quote_data)
             
             if quote_data and quote_data.get('stat') == 'Ok':
                 logger.info("✅ Index quote data received successfully")
@@ -594,21 +1052,18 @@ class FlattradeService:
                 
                 if index:
                     # Create index quote record (no volume)
-                    ltp = Decimal(str(quote_data.get('lp', 0)))
+                    ltp = _to_decimal(quote_data.get('lp'))
                     index_quote = IndexQuote.objects.create(
                         index=index,
                         ltp=ltp,
-                        open_price=Decimal(str(quote_data.get('o', 0))),
-                        high_price=Decimal(str(quote_data.get('h', 0))),
-                        low_price=Decimal(str(quote_data.get('l', 0))),
-                        change=Decimal(str(quote_data.get('c', 0))),
-                        change_percent=Decimal(str(quote_data.get('prctyp', 0))),
+                        open_price=_to_decimal(quote_data.get('o')),
+                        high_price=_to_decimal(quote_data.get('h')),
+                        low_price=_to_decimal(quote_data.get('l')),
+                        change=_to_decimal(quote_data.get('c')),
+                        change_percent=_to_decimal(quote_data.get('prctyp')),
                         atm=calculate_atm(ltp)
                     )
                     
-                    # Cache for 5 minutes
-                    cache.set(cache_key, index_quote, 300)
-                    
                     logger.info(f"✅ Index quote created: {index_quote}")
                     return index_quote
                 else:
@@ -617,20 +1072,16 @@ class FlattradeService:
                 logger.error(f"❌ Index quote API response error: {quote_data}")
                     
         except Exception as e:
-            logger.error(f"💥 Error getting index quote for {symbol}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("💥 Error getting index quote for %s: %s", symbol, e)
             return None
     
-    def get_index_ohlc_data(self, symbol, interval=5, days=1):
-        """Get OHLC data for an index using hardcoded mapping first"""
+    def get_index_ohlc_data(self, symbol, interval=5, days=1, refresh=False):
+        """Get OHLC data for an index using hardcoded mapping first; refresh=True skips the client response cache"""
         logger.info(f"📊 Getting index OHLC data for: {symbol}, interval: {interval}")
         
-        if not self.client or not self.client.is_connected:
-            logger.warning("⚠️ Client not connected, attempting to reconnect...")
-            if not self.setup_client():
-                logger.error("❌ Failed to setup client for index OHLC data")
-                return None
+        if not self._ensure_client():
+            logger.error("❌ Failed to setup client for index OHLC data")
+            return None
         
         try:
             # Use hardcoded mapping if available
@@ -647,7 +1098,7 @@ class FlattradeService:
             else:
                 # Fall back to database lookup
                 try:
-                    index = Index.objects.get(symbol=symbol)
+                    index = get_cached_index(symbol)
                     token = index.token
                     logger.info(f"🔄 Found index {symbol} with token {token} from database")
                 except Index.DoesNotExist:
@@ -662,11 +1113,13 @@ class FlattradeService:
                 return None
                 
             logger.info(f"🔄 Calling get_ohlc_data() for index {symbol} (token: {token}, exchange: {index.exchange})...")
-            ohlc_response = self.client.get_ohlc_data(
+            ohlc_response = self._call_with_retry(
+                self.client.get_ohlc_data,
                 token=token,
                 exchange=index.exchange,
                 interval=interval,
-                days=days
+                days=days,
+                cache=not refresh
             )
             
             if ohlc_response and ohlc_response.get('stat') == 'Ok':
@@ -674,130 +1127,149 @@ class FlattradeService:
                 logger.info(f"📋 Found {len(data)} index OHLC data points")
                 
                 ohlc_records = []
-                successful_records = 0
                 skipped_records = 0
                 
-                for i, item in enumerate(data):
-                    logger.debug(f"📦 Processing index OHLC item {i+1}: {item}")
-                    
-                    # Parse timestamp
-                    timestamp_str = item.get('time', '')
-                    try:
-                        timestamp = datetime.strptime(timestamp_str, '%d-%m-%Y %H:%M:%S')
-                        timestamp = timezone.make_aware(timestamp)
-                    except ValueError as ve:
-                        logger.warning(f"⚠️ Skipping invalid timestamp '{timestamp_str}': {ve}")
+                timestamps = parse_ohlc_timestamps(data)
+                
+                # One range query for candles already stored instead of a check per row
+                existing_timestamps = stored_ohlc_timestamps(
+                    IndexOHLCData.objects.filter(index=index, interval=interval),
+                    timestamps
+                )
+                if existing_timestamps and existing_timestamps.issuperset(ts for ts in timestamps if ts is not None):
+                    logger.info(f"📊 Index OHLC Summary: all {len(existing_timestamps)} candles already stored")
+                    return ohlc_records
+                for item, timestamp in zip(data, timestamps):
+                    if timestamp is None:
+                        logger.warning("Skipping invalid timestamp '%s'", item.get('time', ''))
                         skipped_records += 1
-                        continue
-                    
-                    # Create index OHLC record (no volume)
-                    close_price = Decimal(str(item.get('intc', 0)))
-                    ohlc_record, created = IndexOHLCData.objects.get_or_create(
+                
+                # Build index OHLC records (no volume) in one pass, saved below in a single batch
+                prices = [
+                    (timestamp, _to_decimal(item.get('into')), _to_decimal(item.get('inth')),
+                     _to_decimal(item.get('intl')), _to_decimal(item.get('intc')))
+                    for item, timestamp in zip(data, timestamps)
+                    if timestamp is not None and timestamp not in existing_timestamps
+                ]
+                existing_records = len(data) - skipped_records - len(prices)
+                ohlc_records = [
+                    IndexOHLCData(
                         index=index,
                         timestamp=timestamp,
                         interval=interval,
-                        defaults={
-                            'open_price': Decimal(str(item.get('into', 0))),
-                            'high_price': Decimal(str(item.get('inth', 0))),
-                            'low_price': Decimal(str(item.get('intl', 0))),
-                            'close_price': close_price,
-                            'atm': calculate_atm(close_price)
-                        }
+                        open_price=open_price,
+                        high_price=high_price,
+                        low_price=low_price,
+                        close_price=close_price,
+                        atm=calculate_atm(close_price)
                     )
-                    
-                    if created:
-                        ohlc_records.append(ohlc_record)
-                        successful_records += 1
-                        logger.debug(f"✅ Created index OHLC record: {ohlc_record}")
-                    else:
-                        logger.debug(f"📝 Index OHLC record already exists: {ohlc_record}")
+                    for timestamp, open_price, high_price, low_price, close_price in prices
+                ]
+                
+                # Rows already stored for (index, timestamp, interval) are skipped by the unique constraint.
+                # Every batch of OHLC_BULK_BATCH_SIZE rows goes out as one multi-row INSERT and all
+                # batches commit together, so there is one commit per response rather than per row.
+                if ohlc_records:
+                    with transaction.atomic():
+                        IndexOHLCData.objects.bulk_create(ohlc_records, batch_size=OHLC_BULK_BATCH_SIZE, ignore_conflicts=True)
                 
-                logger.info(f"📊 Index OHLC Summary: {successful_records} new records, {skipped_records} skipped")
+                logger.info(f"📊 Index OHLC Summary: {len(ohlc_records)} new records, {existing_records} already stored, {skipped_records} skipped")
                 return ohlc_records
             else:
                 logger.error(f"❌ Index OHLC API response error: {ohlc_response}")
                     
         except Exception as e:
-            logger.error(f"💥 Error getting index OHLC data for {symbol}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception("💥 Error getting index OHLC data for %s: %s", symbol, e)
             return None
+
+def _run_with_db_cleanup(fn, *args, **kwargs):
+    """
+    Run a service call on a pool thread, honouring CONN_MAX_AGE for its DB connection
     
-    def search_with_parallel_exchanges(self, search_text):
-        """Search stocks and indices across exchanges in parallel"""
-        if not self.client or not self.client.is_connected:
-            if not self.setup_client():
-                return []
+    Pool threads live for the whole process and are never seen by Django's request
+    signals, so stale or expired connections are closed here before and after the call.
+    """
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+def run_parallel(calls, timeout=API_PARALLEL_TIMEOUT):
+    """
+    Run independent blocking service calls side by side on the shared API pool
+    
+    Args:
+        calls: list of (fn, args) pairs
+        timeout (float): seconds to wait for all of them
+        
+    Returns:
+        list of results in the order of calls, None for calls that did not finish in time
+    """
+    futures = [_API_POOL.submit(_run_with_db_cleanup, fn, *args) for fn, args in calls]
+    concurrent.futures.wait(futures, timeout=timeout)
+    return [future.result() if future.done() else None for future in futures]
+
+class RefreshInProgress(Exception):
+    """An identical refresh is still running in another request"""
+
+def coalesced_call(key, fn, *args, **kwargs):
+    """
+    Run a refresh once for all concurrent requests that share the same key
+    
+    Args:
+        key (tuple): identifies the refresh, e.g. (stock_id, interval, 'ohlc')
+        fn: blocking service call to run
+        *args, **kwargs: arguments for fn
+        
+    Returns:
+        the result of fn, shared with every request that arrived while it ran
         
+    Raises:
+        RefreshInProgress: another process is running the same refresh, or the shared
+            refresh did not finish within API_PARALLEL_TIMEOUT
+    """
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = concurrent.futures.Future()
+            _INFLIGHT[key] = future
+    
+    if not is_owner:
         try:
-            exchanges = ['NSE', 'BSE', 'NFO', 'CDS', 'MCX']
-            all_results = []
-            
-            # Use ThreadPoolExecutor for parallel API calls
-            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                # Submit all search tasks
-                future_to_exchange = {
-                    executor.submit(self._search_single_exchange, exchange, search_text): exchange 
-                    for exchange in exchanges
-                }
-                
-                # Collect results as they complete
-                for future in concurrent.futures.as_completed(future_to_exchange):
-                    exchange = future_to_exchange[future]
-                    try:
-                        results = future.result(timeout=10)  # 10 second timeout per exchange
-                        if results:
-                            all_results.extend(results)
-                            logger.info(f"✅ {exchange}: Found {len(results)} results")
-                        else:
-                            logger.info(f"⚠️ {exchange}: No results")
-                    except Exception as e:
-                        logger.error(f"❌ {exchange} search failed: {e}")
-            
-            # Special handling for index discovery
-            if 'nifty' in search_text.lower():
-                logger.info(f"🔍 Adding index discovery for '{search_text}'")
-                index_results = self._discover_indices(search_text)
-                all_results.extend(index_results)
-            
-            # Convert results to database objects
-            stocks = []
-            for item in all_results:
-                symbol = item.get('tsym', '')
-                token = item.get('token', '')
-                search_exchange = item.get('search_exchange', 'NSE')
-                instname = item.get('instname', '')
-                
-                if symbol and token:
-                    if instname == 'INDEX' or 'NIFTY' in symbol:
-                        # Handle as index
-                        index = self.get_or_create_index(
-                            symbol=symbol,
-                            token=token,
-                            name=item.get('cname', symbol)
-                        )
-                        if index:
-                            stocks.append(index)
-                    else:
-                        # Handle as stock
-                        stock = self.get_or_create_stock(
-                            symbol=symbol, 
-                            token=token, 
-                            search_exchange=search_exchange
-                        )
-                        if stock:
-                            stocks.append(stock)
-            
-            logger.info(f"🔍 Parallel search for '{search_text}' returned {len(stocks)} items")
-            return stocks
-                
-        except Exception as e:
-            logger.error(f"💥 Error in parallel search: {e}")
-            return []
+            return future.result(timeout=API_PARALLEL_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            raise RefreshInProgress(
+                f"A refresh for {key} is still running after {API_PARALLEL_TIMEOUT}s, try again shortly"
+            ) from None
+    
+    lock_key = 'refresh:' + ':'.join(str(part) for part in key)
+    got_lock = False
+    try:
+        # Backstop across worker processes when CACHES is a shared backend (Redis, Memcached);
+        # with the default per-process LocMemCache it adds nothing to the future above
+        got_lock = cache.add(lock_key, 1, REFRESH_LOCK_TIMEOUT)
+        if not got_lock:
+            raise RefreshInProgress(f"A refresh for {key} is already running in another process, try again shortly")
+        result = fn(*args, **kwargs)
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+        if got_lock:
+            cache.delete(lock_key)
 
+@functools.lru_cache(maxsize=1)
 def get_flattrade_service():
     """Get singleton FlattradeService instance"""
+    # lru_cache can run this body in two threads on first use; the lock keeps it to one login
     global _service_instance
-    if _service_instance is None:
-        _service_instance = FlattradeService()
+    with _SERVICE_LOCK:
+        if _service_instance is None:
+            _service_instance = FlattradeService()
     return _service_instance
\ No newline at end of file
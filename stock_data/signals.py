@@ -0,0 +1,17 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Stock, Index, stock_cache_key, index_cache_key
+
+
+@receiver([post_save, post_delete], sender=Stock)
+def invalidate_cached_stock(sender, instance, **kwargs):
+    """Drop the cached copy of a stock when its row changes"""
+    cache.delete(stock_cache_key(instance.symbol))
+
+
+@receiver([post_save, post_delete], sender=Index)
+def invalidate_cached_index(sender, instance, **kwargs):
+    """Drop the cached copy of an index when its row changes"""
+    cache.delete(index_cache_key(instance.symbol))
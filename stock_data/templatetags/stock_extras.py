@@ -1,31 +1,41 @@
+import functools
+
 from django import template
 from django.urls import reverse
 
 register = template.Library()
 
+# URL names of the detail pages
+_STOCK_URL = 'stock_detail'
+_INDEX_URL = 'index_detail'
+
+@functools.lru_cache(maxsize=32)
+def _is_index_cls(cls):
+    """
+    Check if a model class is Index; model_name depends only on the class
+    """
+    return cls._meta.model_name == 'index'
+
 @register.simple_tag
 def get_detail_url(obj):
     """
     Get the appropriate detail URL for a Stock or Index object
     """
-    if obj._meta.model_name == 'index':
-        return reverse('index_detail', args=[obj.id])
-    else:
-        return reverse('stock_detail', args=[obj.id])
+    return reverse(_INDEX_URL if _is_index_cls(type(obj)) else _STOCK_URL, args=[obj.id])
 
 @register.simple_tag
 def is_index(obj):
     """
     Check if the object is an Index
     """
-    return obj._meta.model_name == 'index'
+    return _is_index_cls(type(obj))
 
 @register.simple_tag
 def get_display_name(obj):
     """
     Get the appropriate display name for a Stock or Index object
     """
-    if obj._meta.model_name == 'index':
+    if _is_index_cls(type(obj)):
         return getattr(obj, 'name', obj.symbol)
     else:
         return getattr(obj, 'company_name', obj.symbol)
@@ -35,27 +45,18 @@ def get_type_badge(obj):
     """
     Get the appropriate type badge for a Stock or Index object
     """
-    if obj._meta.model_name == 'index':
-        return 'Index'
-    else:
-        return 'Stock'
+    return 'Index' if _is_index_cls(type(obj)) else 'Stock'
 
 @register.simple_tag
 def get_type_icon(obj):
     """
     Get the appropriate icon for a Stock or Index object
     """
-    if obj._meta.model_name == 'index':
-        return 'fas fa-chart-line'
-    else:
-        return 'fas fa-building'
+    return 'fas fa-chart-line' if _is_index_cls(type(obj)) else 'fas fa-building'
 
 @register.simple_tag
 def get_type_color(obj):
     """
     Get the appropriate color class for a Stock or Index object
     """
-    if obj._meta.model_name == 'index':
-        return 'text-info'
-    else:
-        return 'text-primary'
\ No newline at end of file
+    return 'text-info' if _is_index_cls(type(obj)) else 'text-primary'
@@ -1,3 +1,263 @@
-from django.test import TestCase
+import threading
+from datetime import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+import flattrade_client
+from flattrade_client import ttl_cache, SESSION_OPEN_UTC_SECONDS
+from .models import Stock
+from .services import (
+    FlattradeService, RefreshInProgress, coalesced_call, _is_transient_response,
+    _fast_parse_ts, parse_ohlc_timestamps, OHLC_TZ, _MAJOR_INDICES_BIGRAMS, _MAJOR_INDICES_SEARCH,
+)
+from .views import _search_cache_key
+
+# A UTC midnight; the 09:15 IST session opens SESSION_OPEN_UTC_SECONDS later
+DAY_START = 1760486400
+SESSION_OPEN = DAY_START + SESSION_OPEN_UTC_SECONDS
+
+
+class ParseTimestampTests(SimpleTestCase):
+    def test_parses_noren_time_in_ohlc_tz(self):
+        parsed = _fast_parse_ts('15-10-2026 09:15:00')
+        self.assertEqual(parsed, datetime(2026, 10, 15, 9, 15, tzinfo=OHLC_TZ))
+        self.assertIs(parsed.tzinfo, OHLC_TZ)
+
+    def test_malformed_times_give_none(self):
+        data = [
+            {'time': '2026-10-15 09:15:00'},
+            {'time': '15-10-2026 9:15:00x'},
+            {'time': 'aa-bb-cccc dd:ee:ff'},
+            {'time': '32-13-2026 09:15:00'},
+            {'time': ''},
+            {'time': None},
+            {},
+        ]
+        self.assertEqual(parse_ohlc_timestamps(data), [None] * len(data))
+
+    def test_keeps_alignment_with_candles(self):
+        timestamps = parse_ohlc_timestamps([{'time': 'bad'}, {'time': '15-10-2026 09:20:00'}])
+        self.assertIsNone(timestamps[0])
+        self.assertEqual(timestamps[1], datetime(2026, 10, 15, 9, 20, tzinfo=OHLC_TZ))
+
+
+class FakeClient:
+    def __init__(self, response=None):
+        self.calls = 0
+        self.response = response or {'stat': 'Ok', 'data': [1, 2, 3]}
+
+    @ttl_cache(ttl_fn=lambda params: params['interval'] * 60)
+    def fetch(self, token, interval=60):
+        self.calls += 1
+        return dict(self.response)
+
+
+class TTLCacheTests(SimpleTestCase):
+    def setUp(self):
+        flattrade_client._response_cache.clear()
+        self.api = FakeClient()
+
+    def fetch_at(self, now, **kwargs):
+        with mock.patch('flattrade_client.time.time', return_value=now):
+            return self.api.fetch('2885', **kwargs)
+
+    def test_buckets_start_at_session_open(self):
+        # 09:16 and 10:00 IST sit in the same hourly candle, across an epoch-hour boundary
+        self.fetch_at(SESSION_OPEN + 60)
+        self.fetch_at(SESSION_OPEN + 45 * 60)
+        self.assertEqual(self.api.calls, 1)
+
+    def test_next_candle_misses(self):
+        self.fetch_at(SESSION_OPEN + 3599)
+        self.fetch_at(SESSION_OPEN + 3600)
+        self.assertEqual(self.api.calls, 2)
+
+    def test_entry_expires_with_its_bucket(self):
+        self.fetch_at(SESSION_OPEN)
+        self.fetch_at(SESSION_OPEN + 3600 + 1)
+        self.fetch_at(SESSION_OPEN + 3600 + 2)
+        self.assertEqual(self.api.calls, 2)
+
+    def test_cache_false_always_calls(self):
+        self.fetch_at(SESSION_OPEN)
+        self.fetch_at(SESSION_OPEN, cache=False)
+        self.fetch_at(SESSION_OPEN, cache=False)
+        self.assertEqual(self.api.calls, 3)
+
+    def test_callers_get_copies(self):
+        self.fetch_at(SESSION_OPEN)['data'].append(4)
+        self.assertEqual(self.fetch_at(SESSION_OPEN)['data'], [1, 2, 3])
+
+    def test_failures_are_not_cached(self):
+        self.api.response = {'stat': 'Not_Ok', 'emsg': 'error'}
+        self.fetch_at(SESSION_OPEN)
+        self.fetch_at(SESSION_OPEN)
+        self.assertEqual(self.api.calls, 2)
+
+
+class CoalescedCallTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def start_owner(self, key, fn):
+        """Run coalesced_call in a thread and wait until fn is running"""
+        started = threading.Event()
+        outcome = {}
+
+        def owner_fn():
+            started.set()
+            return fn()
+
+        def run():
+            try:
+                outcome['result'] = coalesced_call(key, owner_fn)
+            except Exception as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        started.wait(5)
+        return thread, outcome
+
+    def test_owner_runs_fn_and_releases_lock(self):
+        fn = mock.Mock(return_value=[1, 2])
+        self.assertEqual(coalesced_call(('stock', 1, 'ohlc'), fn, 'RELIANCE-EQ', refresh=True), [1, 2])
+        fn.assert_called_once_with('RELIANCE-EQ', refresh=True)
+        self.assertIsNone(cache.get('refresh:stock:1:ohlc'))
+
+    def test_waiter_shares_owner_result(self):
+        release = threading.Event()
+        thread, outcome = self.start_owner(('stock', 2, 'ohlc'), lambda: release.wait(5) and ['candle'])
+        threading.Timer(0.5, release.set).start()
+
+        waiter_fn = mock.Mock()
+        self.assertEqual(coalesced_call(('stock', 2, 'ohlc'), waiter_fn), ['candle'])
+        thread.join(5)
+        waiter_fn.assert_not_called()
+        self.assertEqual(outcome['result'], ['candle'])
+
+    def test_waiter_gets_owner_exception(self):
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise ValueError('API down')
+
+        thread, outcome = self.start_owner(('stock', 3, 'ohlc'), failing)
+        threading.Timer(0.5, release.set).start()
+
+        with self.assertRaises(ValueError):
+            coalesced_call(('stock', 3, 'ohlc'), mock.Mock())
+        thread.join(5)
+        self.assertIsInstance(outcome['error'], ValueError)
+
+    def test_refresh_locked_elsewhere_raises(self):
+        cache.add('refresh:stock:4:ohlc', 1)
+        fn = mock.Mock()
+        with self.assertRaises(RefreshInProgress):
+            coalesced_call(('stock', 4, 'ohlc'), fn)
+        fn.assert_not_called()
+
+
+class RetryTests(SimpleTestCase):
+    def setUp(self):
+        self.service = FlattradeService.__new__(FlattradeService)
+        patcher = mock.patch('stock_data.services.time.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def api_call(self, *side_effect):
+        fn = mock.Mock(side_effect=side_effect)
+        fn.__name__ = 'get_quotes'
+        return fn
+
+    def test_transient_responses(self):
+        self.assertTrue(_is_transient_response({'stat': 'Not_Ok', 'emsg': 'Too Many Requests'}))
+        self.assertTrue(_is_transient_response({'stat': 'Not_Ok', 'emsg': 'timeout', 'transient': True}))
+        self.assertFalse(_is_transient_response({'stat': 'Not_Ok', 'emsg': 'Invalid symbol'}))
+        self.assertFalse(_is_transient_response({'stat': 'Ok'}))
+        self.assertFalse(_is_transient_response(None))
+        self.assertFalse(_is_transient_response([]))
+
+    def test_deterministic_failure_is_not_retried(self):
+        fn = self.api_call({'stat': 'Not_Ok', 'emsg': 'Invalid symbol'})
+        self.assertEqual(self.service._call_with_retry(fn), {'stat': 'Not_Ok', 'emsg': 'Invalid symbol'})
+        self.assertEqual(fn.call_count, 1)
+        self.sleep.assert_not_called()
+
+    def test_transient_failure_is_retried(self):
+        rate_limited = {'stat': 'Not_Ok', 'emsg': 'rate limit exceeded'}
+        fn = self.api_call(rate_limited, ConnectionError('reset'), {'stat': 'Ok'})
+        self.assertEqual(self.service._call_with_retry(fn), {'stat': 'Ok'})
+        self.assertEqual(fn.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_stops_after_max_retries(self):
+        fn = self.api_call(*[ConnectionError('reset')] * 3)
+        self.assertIsNone(self.service._call_with_retry(fn, max_retries=2))
+        self.assertEqual(fn.call_count, 3)
+
+    def test_stops_when_retry_budget_is_spent(self):
+        fn = self.api_call({'stat': 'Not_Ok', 'emsg': 'rate limit exceeded'}, {'stat': 'Ok'})
+        with mock.patch('stock_data.services.API_RETRY_BUDGET', 0):
+            self.assertEqual(self.service._call_with_retry(fn)['stat'], 'Not_Ok')
+        self.assertEqual(fn.call_count, 1)
+        self.sleep.assert_not_called()
+
+
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('stock_data.views.get_flattrade_service')
+        self.service = patcher.start().return_value
+        self.service.search_stocks.return_value = []
+        self.addCleanup(patcher.stop)
+
+    def search(self, query):
+        return self.client.get(reverse('search_stocks'), {'q': query}).context['stocks']
+
+    def test_narrows_complete_prefix_entry(self):
+        reliance = Stock(id=1, symbol='RELIANCE-EQ', token='2885', company_name='Reliance Industries')
+        relaxo = Stock(id=2, symbol='RELAXO-EQ', token='10000', company_name='Relaxo Footwears')
+        cache.set(_search_cache_key('rel'), {'results': [reliance, relaxo], 'complete': True})
+
+        self.assertEqual([s.symbol for s in self.search('relia')], ['RELIANCE-EQ'])
+        self.service.search_stocks.assert_not_called()
+
+    def test_incomplete_prefix_entry_is_not_narrowed(self):
+        reliance = Stock.objects.create(symbol='RELIANCE-EQ', token='2885', company_name='Reliance Industries')
+        Stock.objects.create(symbol='RELIGARE-EQ', token='2886', company_name='Religare Enterprises')
+        cache.set(_search_cache_key('rel'), {'results': [reliance], 'complete': False})
+
+        self.assertEqual({s.symbol for s in self.search('reli')}, {'RELIANCE-EQ', 'RELIGARE-EQ'})
+
+    def test_failed_api_search_is_not_cached(self):
+        self.service.search_stocks.return_value = None
+        self.assertEqual(self.search('zzzz'), [])
+        self.assertIsNone(cache.get(_search_cache_key('zzzz')))
+
+    def test_empty_api_search_is_cached_complete(self):
+        self.assertEqual(self.search('zzzz'), [])
+        self.assertEqual(cache.get(_search_cache_key('zzzz')), {'results': [], 'complete': True})
+
+
+class MajorIndicesSearchTests(SimpleTestCase):
+    def test_bigram_candidates_match_linear_scan(self):
+        queries = {'zz', 'xq', 'nifty z', 'bank nifty'}
+        for symbol_lower, name_lower, _, _ in _MAJOR_INDICES_SEARCH:
+            for text in (symbol_lower, name_lower):
+                for start in range(len(text)):
+                    for length in range(2, 7):
+                        queries.add(text[start:start + length])
+        queries = {query for query in queries if len(query) >= 2}
+
+        for query in sorted(queries):
+            linear = [entry for entry in _MAJOR_INDICES_SEARCH if query in entry[0] or query in entry[1]]
+            indexed = [
+                entry for entry in _MAJOR_INDICES_BIGRAMS.get(query[:2], ())
+                if query in entry[0] or query in entry[1]
+            ]
+            self.assertEqual(indexed, linear, query)
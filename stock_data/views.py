@@ -1,33 +1,97 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
 from django.contrib import messages
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Q
-from datetime import datetime, timedelta
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef, Q
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from urllib.parse import urlencode
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 
 from .models import Stock, OHLCData, LiveQuote, Index, IndexOHLCData, IndexQuote
-from .services import get_flattrade_service
+from .services import get_flattrade_service, run_parallel, coalesced_call, DASHBOARD_CACHE_KEY
 
-def dashboard(request):
-    """Main dashboard view"""
+# Candle intervals in minutes the views accept, in display order
+VALID_INTERVALS = (1, 3, 5, 15, 30, 60)
+DEFAULT_INTERVAL = 5
+
+# Request values (as sent and as ints) mapped to their interval, checked before int()
+_INTERVAL_LOOKUP = {**{str(i): i for i in VALID_INTERVALS}, **{i: i for i in VALID_INTERVALS}}
+
+# URL name refresh_stock_data redirects back to
+_STOCK_DETAIL_URL_NAME = 'stock_detail'
+
+# Seconds the dashboard row counts are cached
+DASHBOARD_STATS_TTL = 60
+
+# Seconds the whole dashboard context is cached; new candles invalidate it sooner
+DASHBOARD_CONTEXT_TTL = 30
+
+# Search queries are trimmed to SEARCH_MAX_LENGTH; shorter than SEARCH_MIN_LENGTH never hits the API
+SEARCH_MIN_LENGTH = 2
+SEARCH_MAX_LENGTH = 32
+
+# Shortest cached query whose results are narrowed down for longer queries
+SEARCH_PREFIX_MIN_LENGTH = 3
+
+# Seconds search results are cached, and the most database matches shown
+SEARCH_CACHE_TTL = 600
+SEARCH_DB_LIMIT = 50
+
+# Local scrip lookups and searchscrip pages stop at this many rows, so an API result
+# this long may be truncated and is never narrowed for longer queries
+SEARCH_API_RESULT_CAP = 20
+
+def _parse_interval(raw, default=DEFAULT_INTERVAL):
+    """
+    Parse a candle interval from request data
+    
+    Args:
+        raw: interval value from GET/POST, may be missing or malformed
+        default (int): interval used when raw is not a supported value
+        
+    Returns:
+        int: one of VALID_INTERVALS
+    """
+    interval = _INTERVAL_LOOKUP.get(raw)
+    if interval is not None:
+        return interval
+    try:
+        interval = int(raw)
+    except (ValueError, TypeError):
+        return default
+    return interval if interval in _INTERVAL_LOOKUP else default
+
+def _build_dashboard_context():
+    """
+    Build the dashboard context from plain value rows so it can be cached
+    
+    Returns:
+        dict: popular stocks, recent OHLC rows and quotes, and table counts
+    """
     # Get stocks from database (instead of calling API every time)
-    popular_stocks = Stock.objects.all()[:10]
+    popular_stocks = list(Stock.objects.values('id', 'symbol', 'company_name', 'token')[:10])
     
-    # Get recent OHLC data
-    recent_ohlc = OHLCData.objects.select_related('stock').order_by('-timestamp')[:10]
+    # Get recent OHLC data, only the columns the dashboard shows
+    recent_ohlc = list(OHLCData.objects.order_by('-timestamp').values(
+        'stock_id', 'stock__symbol', 'timestamp', 'close_price', 'interval'
+    )[:10])
     
     # Get recent live quotes
-    recent_quotes = LiveQuote.objects.select_related('stock').order_by('-timestamp')[:10]
+    recent_quotes = list(LiveQuote.objects.order_by('-timestamp').values(
+        'stock_id', 'stock__symbol', 'timestamp', 'ltp', 'change', 'change_percent'
+    )[:10])
     
-    # Get some stats for the dashboard
-    total_stocks = Stock.objects.count()
-    total_ohlc_records = OHLCData.objects.count()
-    total_quotes = LiveQuote.objects.count()
+    # Get some stats for the dashboard; approximate is fine, so count at most once a minute
+    total_stocks = cache.get_or_set('stats:stock:count', Stock.objects.count, DASHBOARD_STATS_TTL)
+    total_ohlc_records = cache.get_or_set('stats:ohlcdata:count', OHLCData.objects.count, DASHBOARD_STATS_TTL)
+    total_quotes = cache.get_or_set('stats:livequote:count', LiveQuote.objects.count, DASHBOARD_STATS_TTL)
     
-    context = {
+    return {
         'popular_stocks': popular_stocks,
         'recent_ohlc': recent_ohlc,
         'recent_quotes': recent_quotes,
@@ -35,47 +99,47 @@ def dashboard(request):
         'total_ohlc_records': total_ohlc_records,
         'total_quotes': total_quotes,
     }
+
+def dashboard(request):
+    """Main dashboard view"""
+    context = cache.get_or_set(DASHBOARD_CACHE_KEY, _build_dashboard_context, DASHBOARD_CONTEXT_TTL)
     
     return render(request, 'stock_data/dashboard.html', context)
 
 def stock_detail(request, stock_id):
     """Stock detail view showing OHLC data"""
-    stock = get_object_or_404(Stock, id=stock_id)
+    interval = _parse_interval(request.GET.get('interval'))
 
-    # Get interval from request, default to 5 minutes
-    interval = request.GET.get('interval', 5)
-    
-    # Validate interval - must be one of the supported values
-    valid_intervals = [1, 3, 5, 15, 30, 60]
-    try:
-        interval = int(interval)
-        if interval not in valid_intervals:
-            interval = 5  # fallback to default
-    except (ValueError, TypeError):
-        interval = 5  # fallback to default
-
-    # Check if we have recent data (within last 5 minutes) to avoid API calls
-    from django.utils import timezone
+    # Check if we have recent data (within last 5 minutes) to avoid API calls,
+    # answered by the same query that loads the stock
     five_minutes_ago = timezone.now() - timedelta(minutes=5)
     
-    recent_ohlc = OHLCData.objects.filter(
-        stock=stock,
-        interval=interval,
-        timestamp__gte=five_minutes_ago
-    ).exists()
-    
-    recent_quote = LiveQuote.objects.filter(
-        stock=stock,
-        timestamp__gte=five_minutes_ago
-    ).exists()
+    stock = get_object_or_404(
+        Stock.objects.annotate(
+            has_recent_ohlc=Exists(OHLCData.objects.filter(
+                stock=OuterRef('pk'),
+                interval=interval,
+                timestamp__gte=five_minutes_ago
+            )),
+            has_recent_quote=Exists(LiveQuote.objects.filter(
+                stock=OuterRef('pk'),
+                timestamp__gte=five_minutes_ago
+            ))
+        ),
+        id=stock_id
+    )
+    recent_ohlc = stock.has_recent_ohlc
+    recent_quote = stock.has_recent_quote
     
     # Only refresh if we don't have recent data
     if not recent_ohlc or not recent_quote:
         flattrade_service = get_flattrade_service()
+        calls = []
         if not recent_ohlc:
-            flattrade_service.get_ohlc_data(stock.symbol, interval)
+            calls.append((flattrade_service.get_ohlc_data, (stock.symbol, interval)))
         if not recent_quote:
-            flattrade_service.get_live_quote(stock.symbol)
+            calls.append((flattrade_service.get_live_quote, (stock.symbol,)))
+        run_parallel(calls)
 
     # Get OHLC data for the stock with selected interval
     ohlc_data = OHLCData.objects.filter(
@@ -89,56 +153,55 @@ def stock_detail(request, stock_id):
     page_obj = paginator.get_page(page_number)
 
     # Get latest live quote
-    latest_quote = LiveQuote.objects.filter(stock=stock).order_by('-timestamp').first()
+    # Served by the (stock, -timestamp) index; only the columns the template shows
+    latest_quote = LiveQuote.objects.filter(stock_id=stock.id).order_by('-timestamp').only(
+        'ltp', 'open_price', 'high_price', 'low_price', 'change', 'change_percent', 'volume', 'atm', 'timestamp'
+    ).first()
 
     context = {
         'stock': stock,
         'ohlc_data': page_obj,
         'latest_quote': latest_quote,
         'interval': interval,
-        'valid_intervals': valid_intervals
+        'valid_intervals': VALID_INTERVALS
     }
 
     return render(request, 'stock_data/stock_detail.html', context)
 
 def index_detail(request, index_id):
     """Index detail view showing OHLC data"""
-    index = get_object_or_404(Index, id=index_id)
+    interval = _parse_interval(request.GET.get('interval'))
 
-    # Get interval from request, default to 5 minutes
-    interval = request.GET.get('interval', 5)
-    
-    # Validate interval - must be one of the supported values
-    valid_intervals = [1, 3, 5, 15, 30, 60]
-    try:
-        interval = int(interval)
-        if interval not in valid_intervals:
-            interval = 5  # fallback to default
-    except (ValueError, TypeError):
-        interval = 5  # fallback to default
-
-    # Check if we have recent data (within last 5 minutes) to avoid API calls
-    from django.utils import timezone
+    # Check if we have recent data (within last 5 minutes) to avoid API calls,
+    # answered by the same query that loads the index
     five_minutes_ago = timezone.now() - timedelta(minutes=5)
     
-    recent_ohlc = IndexOHLCData.objects.filter(
-        index=index,
-        interval=interval,
-        timestamp__gte=five_minutes_ago
-    ).exists()
-    
-    recent_quote = IndexQuote.objects.filter(
-        index=index,
-        timestamp__gte=five_minutes_ago
-    ).exists()
+    index = get_object_or_404(
+        Index.objects.annotate(
+            has_recent_ohlc=Exists(IndexOHLCData.objects.filter(
+                index=OuterRef('pk'),
+                interval=interval,
+                timestamp__gte=five_minutes_ago
+            )),
+            has_recent_quote=Exists(IndexQuote.objects.filter(
+                index=OuterRef('pk'),
+                timestamp__gte=five_minutes_ago
+            ))
+        ),
+        id=index_id
+    )
+    recent_ohlc = index.has_recent_ohlc
+    recent_quote = index.has_recent_quote
     
     # Only refresh if we don't have recent data
     if not recent_ohlc or not recent_quote:
         flattrade_service = get_flattrade_service()
+        calls = []
         if not recent_ohlc:
-            flattrade_service.get_index_ohlc_data(index.symbol, interval)
+            calls.append((flattrade_service.get_index_ohlc_data, (index.symbol, interval)))
         if not recent_quote:
-            flattrade_service.get_index_quote(index.symbol)
+            calls.append((flattrade_service.get_index_quote, (index.symbol,)))
+        run_parallel(calls)
 
     # Get OHLC data for the index with selected interval
     ohlc_data = IndexOHLCData.objects.filter(
@@ -152,7 +215,10 @@ def index_detail(request, index_id):
     page_obj = paginator.get_page(page_number)
 
     # Get latest live quote
-    latest_quote = IndexQuote.objects.filter(index=index).order_by('-timestamp').first()
+    # Served by the (index, -timestamp) index; only the columns the template shows
+    latest_quote = IndexQuote.objects.filter(index_id=index.id).order_by('-timestamp').only(
+        'ltp', 'open_price', 'high_price', 'low_price', 'change', 'change_percent', 'atm', 'timestamp'
+    ).first()
 
     context = {
         'index': index,
@@ -160,42 +226,78 @@ def index_detail(request, index_id):
         'ohlc_data': page_obj,
         'latest_quote': latest_quote,
         'interval': interval,
-        'valid_intervals': valid_intervals,
+        'valid_intervals': VALID_INTERVALS,
         'is_index': True
     }
 
     return render(request, 'stock_data/index_detail.html', context)
 
+def _search_cache_key(query):
+    # v2: entries are {'results', 'complete'} dicts rather than bare lists
+    return f'search_v2_{query.replace(" ", "_")}'
+
+def _matches_query(obj, query):
+    """Check if a cached Stock or Index result still matches a longer query"""
+    name = getattr(obj, 'company_name', None) or getattr(obj, 'name', '') or ''
+    return query in obj.symbol.lower() or query in name.lower()
+
 def search_stocks(request):
     """Search stocks view"""
-    query = request.GET.get('q', '')
+    query = request.GET.get('q', '').strip()
+    normalized = query.lower()[:SEARCH_MAX_LENGTH]
     stocks = []
     
     if query:
-        # Search in database first
-        db_stocks = Stock.objects.filter(
-            Q(symbol__icontains=query) | Q(company_name__icontains=query)
-        )
+        # Check cache first to avoid repeated API calls; entries are
+        # {'results': [...], 'complete': bool}
+        cache_key = _search_cache_key(normalized)
+        entry = cache.get(cache_key)
         
-        # Check cache first to avoid repeated API calls
-        from django.core.cache import cache
-        cache_key = f'search_{query.lower().replace(" ", "_")}'
-        cached_results = cache.get(cache_key)
+        if entry is None and len(normalized) > SEARCH_PREFIX_MIN_LENGTH:
+            # Typing "nif" -> "nift" -> "nifty" narrows the longest cached prefix result,
+            # but only one that was not truncated, or valid matches would be dropped
+            prefix_keys = [_search_cache_key(normalized[:i]) for i in range(len(normalized) - 1, SEARCH_PREFIX_MIN_LENGTH - 1, -1)]
+            prefix_entries = cache.get_many(prefix_keys)
+            for key in prefix_keys:
+                prefix_entry = prefix_entries.get(key)
+                if prefix_entry and prefix_entry['complete']:
+                    narrowed = [s for s in prefix_entry['results'] if _matches_query(s, normalized)]
+                    if narrowed:
+                        entry = {'results': narrowed, 'complete': True}
+                        cache.set(cache_key, entry, SEARCH_CACHE_TTL)
+                    break
         
-        if cached_results:
-            stocks = cached_results
-        elif 'nifty' in query.lower() or not db_stocks:
-            flattrade_service = get_flattrade_service()
-            api_stocks = flattrade_service.search_stocks(query)
-            
-            # Combine database and API results, removing duplicates
-            all_stocks = list(db_stocks) + [s for s in api_stocks if s not in db_stocks]
-            stocks = all_stocks
-            
-            # Cache results for 10 minutes
-            cache.set(cache_key, stocks, 600)
+        if entry and entry['results']:
+            stocks = entry['results']
         else:
-            stocks = db_stocks
+            # Search in database, bounded so broad queries stay cheap; one extra row
+            # tells whether the result was cut off
+            db_stocks = list(
+                Stock.objects.filter(
+                    Q(symbol__icontains=normalized) | Q(company_name__icontains=normalized)
+                ).only('id', 'symbol', 'token', 'exchange', 'company_name')[:SEARCH_DB_LIMIT + 1]
+            )
+            db_truncated = len(db_stocks) > SEARCH_DB_LIMIT
+            db_stocks = db_stocks[:SEARCH_DB_LIMIT]
+            
+            if len(normalized) >= SEARCH_MIN_LENGTH and ('nifty' in normalized or not db_stocks):
+                flattrade_service = get_flattrade_service()
+                api_stocks = flattrade_service.search_stocks(query[:SEARCH_MAX_LENGTH])
+                search_failed = api_stocks is None
+                api_stocks = api_stocks or []
+                
+                # Combine database and API results, removing duplicates
+                db_ids = {s.id for s in db_stocks}
+                stocks = db_stocks + [s for s in api_stocks if not (isinstance(s, Stock) and s.id in db_ids)]
+                
+                # A failed API search (e.g. rate limited) is not cached, so the next request retries it
+                if not search_failed:
+                    cache.set(cache_key, {
+                        'results': stocks,
+                        'complete': not db_truncated and len(api_stocks) < SEARCH_API_RESULT_CAP
+                    }, SEARCH_CACHE_TTL)
+            else:
+                stocks = db_stocks
     
     context = {
         'query': query,
@@ -236,37 +338,16 @@ def get_ohlc_data(request, stock_id):
     """AJAX endpoint to get OHLC data"""
     stock = get_object_or_404(Stock, id=stock_id)
     
-    # Get interval from request, default to 5 minutes
-    interval = request.GET.get('interval', 5)
-    
-    # Validate interval
-    valid_intervals = [1, 3, 5, 15, 30, 60]
-    try:
-        interval = int(interval)
-        if interval not in valid_intervals:
-            interval = 5  # fallback to default
-    except (ValueError, TypeError):
-        interval = 5  # fallback to default
+    interval = _parse_interval(request.GET.get('interval'))
     
     flattrade_service = get_flattrade_service()
-    ohlc_records = flattrade_service.get_ohlc_data(stock.symbol, interval)
+    ohlc_rows = flattrade_service.get_ohlc_rows_values(stock.symbol, interval, refresh=True)
     
-    if ohlc_records:
+    if ohlc_rows:
         data = {
             'success': True,
             'interval': interval,
-            'data': [
-                {
-                    'timestamp': record.timestamp.isoformat(),
-                    'open': float(record.open_price),
-                    'high': float(record.high_price),
-                    'low': float(record.low_price),
-                    'close': float(record.close_price),
-                    'atm': float(record.atm) if record.atm else None,
-                    'volume': record.volume
-                }
-                for record in ohlc_records
-            ]
+            'data': ohlc_rows
         }
     else:
         data = {
@@ -274,32 +355,22 @@ def get_ohlc_data(request, stock_id):
             'error': 'Failed to fetch OHLC data'
         }
     
-    return JsonResponse(data)
+    return JsonResponse(data, encoder=DjangoJSONEncoder)
 
 
 def refresh_stock_data(request, stock_id):
     """Refresh stock data (OHLC and live quote)"""
     stock = get_object_or_404(Stock, id=stock_id)
     
-    # Get interval from request, default to 5 minutes
-    interval = request.GET.get('interval', 5)
-    
-    # Validate interval
-    valid_intervals = [1, 3, 5, 15, 30, 60]
-    try:
-        interval = int(interval)
-        if interval not in valid_intervals:
-            interval = 5  # fallback to default
-    except (ValueError, TypeError):
-        interval = 5  # fallback to default
+    interval = _parse_interval(request.GET.get('interval'))
     
     flattrade_service = get_flattrade_service()
     
     # Refresh OHLC data with selected interval
-    ohlc_records = flattrade_service.get_ohlc_data(stock.symbol, interval)
+    ohlc_records = flattrade_service.get_ohlc_data(stock.symbol, interval, refresh=True)
     
     # Refresh live quote
-    live_quote = flattrade_service.get_live_quote(stock.symbol)
+    live_quote = flattrade_service.get_live_quote(stock.symbol, refresh=True)
     
     if ohlc_records or live_quote:
         messages.success(request, f'Data refreshed for {stock.symbol} ({interval} min intervals)')
@@ -307,9 +378,9 @@ def refresh_stock_data(request, stock_id):
         messages.error(request, f'Failed to refresh data for {stock.symbol}')
     
     # Redirect back with interval parameter preserved
-    redirect_url = f'/stock/{stock_id}/'
-    if interval != 5:  # Only add parameter if not default
-        redirect_url += f'?interval={interval}'
+    redirect_url = reverse(_STOCK_DETAIL_URL_NAME, args=[stock_id])
+    if interval != DEFAULT_INTERVAL:  # Only add parameter if not default
+        redirect_url += '?' + urlencode({'interval': interval})
     
     return redirect(redirect_url)
 
@@ -319,21 +390,14 @@ def refresh_data_async(request, stock_id):
     """Asynchronously refresh stock data without blocking UI"""
     try:
         stock = get_object_or_404(Stock, id=stock_id)
-        interval = request.POST.get('interval', 5)
-        
-        # Validate interval
-        valid_intervals = [1, 3, 5, 15, 30, 60]
-        try:
-            interval = int(interval)
-            if interval not in valid_intervals:
-                interval = 5
-        except (ValueError, TypeError):
-            interval = 5
+        interval = _parse_interval(request.POST.get('interval'))
         
         # Refresh data in background
         flattrade_service = get_flattrade_service()
-        ohlc_records = flattrade_service.get_ohlc_data(stock.symbol, interval)
-        live_quote = flattrade_service.get_live_quote(stock.symbol)
+        ohlc_records = coalesced_call(
+            (stock.id, interval, 'ohlc'), flattrade_service.get_ohlc_data, stock.symbol, interval, refresh=True
+        )
+        live_quote = flattrade_service.get_live_quote(stock.symbol, refresh=True)
         
         return JsonResponse({
             'success': True,
@@ -354,21 +418,15 @@ def refresh_index_data_async(request, index_id):
     """Asynchronously refresh index data without blocking UI"""
     try:
         index = get_object_or_404(Index, id=index_id)
-        interval = request.POST.get('interval', 5)
-        
-        # Validate interval
-        valid_intervals = [1, 3, 5, 15, 30, 60]
-        try:
-            interval = int(interval)
-            if interval not in valid_intervals:
-                interval = 5
-        except (ValueError, TypeError):
-            interval = 5
+        interval = _parse_interval(request.POST.get('interval'))
         
         # Refresh data in background
         flattrade_service = get_flattrade_service()
-        ohlc_records = flattrade_service.get_index_ohlc_data(index.symbol, interval)
-        index_quote = flattrade_service.get_index_quote(index.symbol)
+        ohlc_records = coalesced_call(
+            (index.id, interval, 'index_ohlc'), flattrade_service.get_index_ohlc_data, index.symbol, interval,
+            refresh=True
+        )
+        index_quote = flattrade_service.get_index_quote(index.symbol, refresh=True)
         
         return JsonResponse({
             'success': True,
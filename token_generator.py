@@ -10,24 +10,66 @@ Token generation involves a 2-step process:
 Run this script daily before market hours to get your token.
 """
 
+import argparse
+import asyncio
 import hashlib
+import os
 import requests
+import threading
 import webbrowser
 import urllib.parse
+from datetime import datetime
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional; the stdlib json module produces the same payload
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    
+    def _json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+    
+    _json_loads = json.loads
+
+# File step 2 saves the USER_ID/TOKEN lines to
+TOKEN_FILE = 'daily_token.txt'
+
+# (connect, read) timeout in seconds for the token API
+TOKEN_API_TIMEOUT = (3.05, 10)
 
 class FlattradeTokenGenerator:
-    def __init__(self, api_key, api_secret):
+    def __init__(self, api_key, api_secret, verbose=False):
         """
         Initialize token generator with API credentials
         
         Args:
             api_key (str): Your Flattrade API Key
             api_secret (str): Your Flattrade API Secret
+            verbose (bool): Also print hash and request diagnostics (default: False)
         """
         self.api_key = api_key
         self.api_secret = api_secret
+        self.verbose = verbose
         self.base_url = "https://authapi.flattrade.in/trade/apitoken"
         self.auth_url = f"https://auth.flattrade.in/?app_key={api_key}"
+        
+        # API_KEY never changes for this instance, so hash it once; hashlib
+        # (OpenSSL) already uses the CPU SHA extensions when present
+        self._key_hasher = hashlib.sha256(api_key.encode())
+        self._secret_bytes = api_secret.encode()
+        
+        # Keep-alive session so retried token requests reuse the TLS connection
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=2,
+            max_retries=Retry(total=3, backoff_factor=0.2)
+        ))
     
     def step1_get_authorization_code(self):
         """
@@ -45,8 +87,9 @@ class FlattradeTokenGenerator:
         print("5. The URL will look like: https://127.0.0.1:8080/?request_code=XXXXXX")
         print("\nOpening browser...")
         
-        # Open browser for manual authentication
-        webbrowser.open(self.auth_url)
+        # Open browser for manual authentication; launching it can take a moment,
+        # so do it in the background and show the prompt straight away
+        threading.Thread(target=webbrowser.open, args=(self.auth_url,), daemon=True).start()
         
         # Get request code from user
         request_code = input("\n📋 Enter the request_code from the redirect URL: ").strip()
@@ -57,12 +100,69 @@ class FlattradeTokenGenerator:
         
         return request_code
     
-    def step2_generate_token(self, request_code):
+    def _request_token(self, request_code):
+        """
+        Exchange a request code for a token, without printing results or writing files
+        
+        Args:
+            request_code (str): Authorization code from step 1
+            
+        Returns:
+            tuple: (response dict, None) on success, or (None, error message)
+        """
+        # Create SHA256 hash: API_KEY + request_code + API_SECRET
+        # Continue from the hash state already seeded with API_KEY
+        hasher = self._key_hasher.copy()
+        hasher.update(request_code.encode())
+        hasher.update(self._secret_bytes)
+        hash_value = hasher.hexdigest()
+        
+        if self.verbose:
+            print(f"📝 Hash string: {self.api_key} + {request_code} + <API secret>")
+            print(f"🔐 Generated hash: {hash_value[:10]}...")
+        
+        # Prepare payload
+        payload = {
+            "api_key": self.api_key,
+            "request_code": request_code,
+            "api_secret": hash_value
+        }
+        
+        # Make API request to generate token
+        if self.verbose:
+            print("📡 Sending request to Flattrade API...")
+        try:
+            response = self._session.post(
+                self.base_url,
+                data=_json_dumps(payload),
+                headers={'Content-Type': 'application/json'},
+                timeout=TOKEN_API_TIMEOUT
+            )
+        except requests.RequestException as e:
+            return None, f"Error generating token: {e}"
+        
+        if response.status_code != 200:
+            return None, f"HTTP Error {response.status_code}: {response.text}"
+        
+        # ValueError covers both orjson and json decode errors
+        try:
+            data = _json_loads(response.content)
+        except ValueError as e:
+            return None, f"Invalid token API response: {e}"
+        
+        if not isinstance(data, dict):
+            return None, f"Unexpected token API response: {data!r}"
+        if data.get('stat') != 'Ok':
+            return None, f"Token generation failed: {data}"
+        return data, None
+    
+    def step2_generate_token(self, request_code, token_file=TOKEN_FILE):
         """
         Step 2: Generate token using SHA256 hash
         
         Args:
             request_code (str): Authorization code from step 1
+            token_file (str): File the USER_ID/TOKEN lines are saved to, None to skip
             
         Returns:
             str: Generated token or None if failed
@@ -70,54 +170,30 @@ class FlattradeTokenGenerator:
         print("\n🔑 Step 2: Generating Token")
         print("="*50)
         
-        try:
-            # Create SHA256 hash: API_KEY + request_code + API_SECRET
-            hash_string = self.api_key + request_code + self.api_secret
-            hash_value = hashlib.sha256(hash_string.encode()).hexdigest()
-            
-            print(f"📝 Hash string: {self.api_key} + {request_code} + {self.api_secret[:4]}...")
-            print(f"🔐 Generated hash: {hash_value[:10]}...")
-            
-            # Prepare payload
-            payload = {
-                "api_key": self.api_key,
-                "request_code": request_code,
-                "api_secret": hash_value
-            }
-            
-            # Make API request to generate token
-            print("📡 Sending request to Flattrade API...")
-            response = requests.post(self.base_url, json=payload)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get('stat') == 'Ok':
-                    token = data.get('token')
-                    user_id = data.get('userid')
-                    
-                    print("✅ Token generated successfully!")
-                    print(f"👤 User ID: {user_id}")
-                    print(f"🎟️  Token: {token}")
-                    
-                    # Save token to file for easy access
-                    with open('daily_token.txt', 'w') as f:
-                        f.write(f"USER_ID = \"{user_id}\"\n")
-                        f.write(f"TOKEN = \"{token}\"\n")
-                        f.write(f"# Generated on: {requests.utils.default_headers()}\n")
-                    
-                    print("💾 Token saved to 'daily_token.txt'")
-                    return token
-                else:
-                    print(f"❌ Token generation failed: {data}")
-                    return None
-            else:
-                print(f"❌ HTTP Error {response.status_code}: {response.text}")
-                return None
-                
-        except Exception as e:
-            print(f"❌ Error generating token: {e}")
+        data, error = self._request_token(request_code)
+        if error:
+            print(f"❌ {error}")
             return None
+        
+        token = data.get('token')
+        user_id = data.get('userid')
+        
+        lines = [
+            "✅ Token generated successfully!",
+            f"👤 User ID: {user_id}",
+            f"🎟️  Token: {token}"
+        ]
+        if token_file:
+            # Save token to file for easy access
+            Path(token_file).write_bytes((
+                f"USER_ID = \"{user_id}\"\n"
+                f"TOKEN = \"{token}\"\n"
+                f"# Generated on: {datetime.now().isoformat(timespec='seconds')}\n"
+            ).encode())
+            lines.append(f"💾 Token saved to '{token_file}'")
+        
+        print("\n".join(lines))
+        return token
     
     def generate_token(self):
         """
@@ -139,19 +215,84 @@ class FlattradeTokenGenerator:
         token = self.step2_generate_token(request_code)
         
         if token:
-            print("\n🎉 Token generation completed successfully!")
-            print("\n📋 Next steps:")
-            print("1. Copy the token from above")
-            print("2. Update your credentials.py file")
-            print("3. Run your trading scripts")
-            print("\n⏰ Remember: Token expires daily, run this script every day!")
+            print("\n".join([
+                "\n🎉 Token generation completed successfully!",
+                "\n📋 Next steps:",
+                "1. Copy the token from above",
+                "2. Update your credentials.py file",
+                "3. Run your trading scripts",
+                "\n⏰ Remember: Token expires daily, run this script every day!"
+            ]))
         
         return token
+    
+    async def request_token_async(self, request_code):
+        """
+        Step 2 without blocking the event loop; prints nothing and writes no file,
+        so several accounts can run side by side
+        
+        Args:
+            request_code (str): Authorization code from step 1
+            
+        Returns:
+            tuple: (token, None) on success, or (None, error message)
+        """
+        data, error = await asyncio.to_thread(self._request_token, request_code)
+        return (data.get('token'), None) if data else (None, error)
+    
+    @classmethod
+    def generate_tokens_batch(cls, creds, verbose=False):
+        """
+        Run step 2 for several accounts concurrently
+        
+        Args:
+            creds (list): (api_key, api_secret, request_code) tuples
+            verbose (bool): Print hash and request diagnostics for every account
+            
+        Returns:
+            list: Token or None for each account, in the same order
+        """
+        return asyncio.run(generate_tokens_async([
+            (cls(api_key, api_secret, verbose=verbose), request_code)
+            for api_key, api_secret, request_code in creds
+        ]))
+
+async def generate_tokens_async(requests_by_generator):
+    """
+    Run step 2 for several accounts concurrently, one session per generator
+    
+    Nothing is written to disk; one result line per account is printed once
+    all requests have finished, so output from different accounts never mixes.
+    
+    Args:
+        requests_by_generator (list): (FlattradeTokenGenerator, request_code) pairs
+        
+    Returns:
+        list: Token or None for each pair, in the same order
+    """
+    results = await asyncio.gather(*(
+        generator.request_token_async(request_code)
+        for generator, request_code in requests_by_generator
+    ))
+    print("\n".join(
+        f"✅ {generator.api_key}: token generated" if token else f"❌ {generator.api_key}: {error}"
+        for (generator, _), (token, error) in zip(requests_by_generator, results)
+    ))
+    return [token for token, _ in results]
 
 def main():
     """
     Main function to run token generation
     """
+    parser = argparse.ArgumentParser(description="Generate the daily Flattrade API token")
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        default=os.environ.get('FLATTRADE_TOKEN_VERBOSE', '') not in ('', '0'),
+        help="Print hash and request diagnostics (or set FLATTRADE_TOKEN_VERBOSE=1)"
+    )
+    args = parser.parse_args()
+    
     print("Please enter your Flattrade API credentials:")
     api_key = input("🔑 API Key: ").strip()
     api_secret = input("🔐 API Secret: ").strip()
@@ -161,7 +302,7 @@ def main():
         return
     
     # Create token generator
-    generator = FlattradeTokenGenerator(api_key, api_secret)
+    generator = FlattradeTokenGenerator(api_key, api_secret, verbose=args.verbose)
     
     # Generate token
     token = generator.generate_token()